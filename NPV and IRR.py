@@ -1,8 +1,32 @@
+import html
+import logging
+
 import streamlit as st
-import numpy as np
-import numpy_financial as npf
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+# All computations live in the headless npv_irr package; this script is only the UI
+from npv_irr import (
+    ComputationCache,
+    IncrementalCurve,
+    NPVFigure,
+    ParseError,
+    Profiler,
+    ResultStore,
+    build_comparison_figure,
+    build_tornado_figure,
+    cash_flow_key,
+    compare_projects,
+    compute_npv,
+    irr_summary,
+    parse_cash_flows,
+    parse_projects,
+    profiling_enabled,
+    sensitivity_csv,
+    set_profiler,
+    simulate,
+    stage,
+    tornado,
+)
+from npv_irr.table import PAGE_SIZE, cash_flow_table_html, page_count
 
 # Set the page layout to wide and add a custom title/icon
 st.set_page_config(
@@ -83,6 +107,25 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def enable_profile_logging():
+    # Streamlit only shows WARNING and above; print the per-run profile records to the console, once per process
+    logger = logging.getLogger("npv_irr.profiling")
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Per-stage timings for this rerun (on by default when NPV_IRR_PROFILE=1)
+with st.sidebar.expander("Profiling", expanded=False):
+    profile_enabled = st.toggle("Time each stage", value=profiling_enabled())
+    profile_panel = st.container()
+if profile_enabled:
+    enable_profile_logging()
+profiler = Profiler() if profile_enabled else None
+set_profiler(profiler)
+
 # Custom header with logo/title
 st.markdown('<h1 class="main-header">📊 NPV and IRR Visualizer</h1>', unsafe_allow_html=True)
 
@@ -97,6 +140,17 @@ with st.expander("ℹ️ About this tool", expanded=False):
     Enter your cash flows as comma-separated values, with the initial investment as a negative number.
     """)
 
+def parse_error_html(error):
+    """The invalid-input warning box for a ParseError, listing its issues."""
+    details = "".join(
+        f"<li>Period {issue.period} (line {issue.line}, column {issue.column}): {issue.reason} <code>{html.escape(issue.token)}</code></li>"
+        for issue in error.issues
+    )
+    if error.total > len(error.issues):
+        details += f"<li>...and {error.total - len(error.issues)} more</li>"
+    details = f"<ul>{details}</ul>" if details else ""
+    return f'<div class="warning-box">Invalid input. Please enter valid numbers separated by commas or line breaks.{details}</div>'
+
 # Initialize session state for template button
 if "use_template" not in st.session_state:
     st.session_state.use_template = False
@@ -122,16 +176,24 @@ with col_left:
         help="Enter the initial investment as a negative number, followed by the cash inflows"
     )
     
+    # Long series can be uploaded instead (comma- or newline-separated)
+    cash_flow_file = st.file_uploader(
+        "...or upload a file of cash flows:",
+        type=["csv", "txt"],
+        help="One value per line or comma-separated; the uploaded file takes precedence over the text box"
+    )
+    
     # Reset the template flag after use
     if st.session_state.use_template:
         st.session_state.use_template = False
     
-    # Convert the cash flow input into a list of floats
+    # Convert the cash flow input into an array of floats
     try:
-        cash_flows = [float(x.strip()) for x in cash_flow_input.split(",")]
+        with stage("parse"):
+            cash_flows = parse_cash_flows(cash_flow_file if cash_flow_file is not None else cash_flow_input)
         valid_input = True
-    except Exception:
-        st.markdown('<div class="warning-box">Invalid input. Please enter valid numbers separated by commas.</div>', unsafe_allow_html=True)
+    except ParseError as error:
+        st.markdown(parse_error_html(error), unsafe_allow_html=True)
         valid_input = False
     
     # Option to add a template - using the callback function
@@ -145,26 +207,23 @@ with col_left:
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.markdown('<div class="subheader">Cash Flow Summary</div>', unsafe_allow_html=True)
         
-        # Create a table showing periods and cash flows
-        periods = list(range(len(cash_flows)))
-        cf_data = {"Period": periods, "Cash Flow": cash_flows}
-        
-        # Display cash flow table with custom styling
+        # Display one page of the cash flow table with custom styling
+        n_pages = page_count(len(cash_flows))
+        page = 1
+        if n_pages > 1:
+            page = st.number_input(f"Page (of {n_pages}):", min_value=1, max_value=n_pages, value=1, step=1)
         st.markdown('<div class="cf-table">', unsafe_allow_html=True)
-        cf_table = "<table width='100%'><thead><tr><th>Period</th><th>Cash Flow</th></tr></thead><tbody>"
-        
-        for i, cf in zip(periods, cash_flows):
-            # Highlight negative values in red, positive in green
-            color = "#DC2626" if cf < 0 else "#16A34A" if cf > 0 else "#000000"
-            cf_table += f"<tr><td style='text-align: center;'>{i}</td><td style='text-align: right; color: {color};'>€{cf:,.2f}</td></tr>"
-        
-        cf_table += "</tbody></table>"
-        st.markdown(cf_table, unsafe_allow_html=True)
+        with stage("table_html"):
+            table_html = cash_flow_table_html(cash_flows, page)
+        st.markdown(table_html, unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
+        if n_pages > 1:
+            first = (page - 1) * PAGE_SIZE
+            st.caption(f"Periods {first}–{min(first + PAGE_SIZE, len(cash_flows)) - 1} of {len(cash_flows)} cash flows")
         
         # Calculate and display initial investment and total cash inflows
         init_investment = cash_flows[0] if cash_flows[0] < 0 else 0
-        total_inflows = sum(cf for cf in cash_flows if cf > 0)
+        total_inflows = cash_flows[cash_flows > 0].sum()
         
         col1, col2 = st.columns(2)
         with col1:
@@ -199,7 +258,8 @@ with col_left:
         help="High detail provides a smoother curve and better exports"
     )
     
-    # Set number of points based on resolution choice
+    # Set the curve's error tolerance (in pixels) and point budget based on resolution choice
+    pixel_tolerance = 0.25 if resolution == "High" else 1.0
     num_points = 500 if resolution == "High" else 100
     
     st.markdown('</div>', unsafe_allow_html=True)
@@ -220,73 +280,31 @@ with col_left:
     """)
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Define a function to compute NPV
-def compute_npv(cash_flows, r):
-    return sum(cf / ((1 + r) ** t) for t, cf in enumerate(cash_flows))
+# One bounded cache shared by all reruns and sessions (size/policy via NPV_IRR_CACHE_SIZE/NPV_IRR_CACHE_POLICY)
+@st.cache_resource
+def get_computation_cache():
+    return ComputationCache.from_env()
 
-# Function to find multiple IRRs
-def find_multiple_irrs(cash_flows, rate_min=0.0001, rate_max=0.9999, precision=0.0001):
-    """Find multiple IRRs if they exist by identifying zero-crossings in the NPV function."""
-    # Generate a dense set of rates for precise zero detection
-    dense_rates = np.linspace(rate_min, rate_max, 10000)
-    dense_npvs = [compute_npv(cash_flows, r) for r in dense_rates]
-    
-    # Find where the NPV changes sign (zero crossings)
-    zero_crossings = []
-    for i in range(1, len(dense_npvs)):
-        if dense_npvs[i-1] * dense_npvs[i] <= 0:  # Sign change detected
-            # Binary search to find more precise IRR
-            low, high = dense_rates[i-1], dense_rates[i]
-            while high - low > precision:
-                mid = (low + high) / 2
-                npv_mid = compute_npv(cash_flows, mid)
-                if npv_mid * compute_npv(cash_flows, low) <= 0:
-                    high = mid
-                else:
-                    low = mid
-            zero_crossings.append((low + high) / 2)
-    
-    # Count sign changes in cash flows to check if multiple IRRs are theoretically possible
-    sign_changes = sum(1 for i in range(1, len(cash_flows)) if cash_flows[i-1] * cash_flows[i] < 0)
-    
-    # Filter out very close values (could be duplicates due to numerical precision)
-    if len(zero_crossings) > 1:
-        filtered = [zero_crossings[0]]
-        for irr in zero_crossings[1:]:
-            if min(abs(irr - existing) for existing in filtered) > 0.01:  # 1% difference threshold
-                filtered.append(irr)
-        zero_crossings = filtered
-    
-    return zero_crossings, sign_changes
+computation_cache = get_computation_cache()
 
 if valid_input:
-    # Generate a set of discount rates to evaluate
-    rates = np.linspace(min_rate_dec, max_rate_dec, num_points)
-    npv_values = [compute_npv(cash_flows, r) for r in rates]
+    # IRRs and the stored NPV curve are cached per cash-flow vector; moving the
+    # slider only evaluates the curve at rates that were never needed before
+    cf_key = cash_flow_key(cash_flows)
+    with stage("irrs"):
+        irrs, sign_changes, multiple_irrs = computation_cache.get_or_compute(("irrs", cf_key), irr_summary, cash_flows)
     
-    # Find multiple IRRs if they exist
-    irrs, sign_changes = find_multiple_irrs(cash_flows)
+    # Sample the curve adaptively: dense near IRRs and bends, sparse where it is nearly straight
+    with stage("curve"):
+        npv_curve_cache = computation_cache.get_or_compute(("curve", cf_key), IncrementalCurve, cash_flows)
+        rates, npv_values = npv_curve_cache.sample(
+            min_rate_dec, max_rate_dec, irrs, pixel_tolerance=pixel_tolerance, max_points=num_points
+        )
     
     # Check if we found any valid IRRs
     irr_valid = len(irrs) > 0
-    multiple_irrs = len(irrs) > 1
-    
-    # Also try numpy_financial's IRR method as a backup
-    try:
-        npf_irr = npf.irr(cash_flows)
-        # Add this IRR if it's not already in our list (within a tolerance)
-        if irr_valid and all(abs(npf_irr - irr) > 0.01 for irr in irrs):
-            irrs.append(npf_irr)
-        elif not irr_valid:
-            irrs = [npf_irr]
-            irr_valid = True
-    except Exception:
-        # Our custom algorithm may have found IRRs even if numpy_financial didn't
-        pass
     
-    # Sort IRRs for display purposes
     if irr_valid:
-        irrs.sort()
         # Convert to percentages
         irrs_percent = [irr * 100 for irr in irrs]
     
@@ -294,126 +312,26 @@ if valid_input:
         # Card for NPV visualization
         st.markdown('<div class="card plot-container">', unsafe_allow_html=True)
         
-        # Create the plotly figure
-        fig = go.Figure()
-        
-        # Add the NPV curve
-        fig.add_trace(go.Scatter(
-            x=rates * 100,
-            y=npv_values,
-            mode='lines',
-            name='NPV Curve',
-            line=dict(color='#3b82f6', width=3),
-            hovertemplate='Rate: %{x:.2f}%<br>NPV: €%{y:.2f}<extra></extra>'
-        ))
-        
-        # Add zero line
-        fig.add_shape(
-            type="line",
-            x0=min_rate,
-            y0=0,
-            x1=max_rate,
-            y1=0,
-            line=dict(
-                color="black",
-                width=1,
-                dash="dash",
-            )
-        )
-        
-        # If IRRs are computed and lie within the selected discount rate range, mark them
-        if irr_valid:
-            # Colors for multiple IRRs if needed
-            irr_colors = ['red', 'purple', 'orange', 'green']
-            
-            for idx, (irr, irr_percent) in enumerate(zip(irrs, irrs_percent)):
-                if min_rate <= irr_percent <= max_rate:
-                    color = irr_colors[idx % len(irr_colors)]
-                    npv_at_irr = compute_npv(cash_flows, irr)
-                    
-                    # Add IRR point
-                    fig.add_trace(go.Scatter(
-                        x=[irr_percent],
-                        y=[npv_at_irr],
-                        mode='markers',
-                        marker=dict(size=12, color=color, symbol='circle'),
-                        name=f'IRR {idx+1} = {irr_percent:.2f}%',
-                        hovertemplate='IRR {}: %{{x:.2f}}%<br>NPV: €%{{y:.2f}}<extra></extra>'.format(idx+1)
-                    ))
-                    
-                    # Add IRR vertical line
-                    fig.add_shape(
-                        type="line",
-                        x0=irr_percent,
-                        y0=min(npv_values) if min(npv_values) < 0 else 0,
-                        x1=irr_percent,
-                        y1=0,
-                        line=dict(
-                            color=color,
-                            width=1,
-                            dash="dash",
-                        )
-                    )
-                    
-                    # Add IRR annotation
-                    fig.add_annotation(
-                        x=irr_percent,
-                        y=0,
-                        text=f"IRR {idx+1}: {irr_percent:.2f}%",
-                        showarrow=True,
-                        arrowhead=2,
-                        arrowsize=1,
-                        arrowwidth=2,
-                        arrowcolor=color,
-                        ax=0,
-                        ay=-40 - (idx * 30),  # Stagger annotations
-                        bordercolor=color,
-                        borderwidth=2,
-                        borderpad=8,
-                        bgcolor="white",
-                        opacity=0.8,
-                        font=dict(color=color, size=16)  # Increased font size
-                    )
-        
-        # Customize the layout
-        fig.update_layout(
-            title=dict(
-                text="NPV vs. Discount Rate",
-                font=dict(size=24)
-            ),
-            xaxis=dict(
-                title=dict(text="Discount Rate (%)", font=dict(size=18)),
-                tickfont=dict(size=14),
-                tickformat='.1f'
-            ),
-            yaxis=dict(
-                title=dict(text="Net Present Value (€)", font=dict(size=18)),
-                tickfont=dict(size=14),
-                tickformat=',.2f'
-            ),
-            legend=dict(
-                orientation="h", 
-                y=-0.2, 
-                x=0.5,
-                font=dict(size=16)
-            ),
-            height=600,
-            margin=dict(l=80, r=80, t=80, b=120)
-        )
+        # The figure lives in the session and is only patched where the inputs changed
+        if "npv_figure" not in st.session_state:
+            st.session_state.npv_figure = NPVFigure()
+        with stage("figure"):
+            fig = st.session_state.npv_figure.update(cash_flows, rates, npv_values, irrs, min_rate, max_rate)
         
         # Note about SVG export
         st.info("For high-quality exports, use the camera icon in the plot toolbar and select SVG format.")
         
         # Display the chart with improved SVG export options
-        st.plotly_chart(fig, use_container_width=True, config={
-            'toImageButtonOptions': {
-                'format': 'svg', 
-                'filename': 'npv_irr_chart',
-                'width': 1000,   # Adjusted for better proportion
-                'height': 600,   # Match the displayed chart height
-                'scale': 2       # Maintain quality without scaling issues
-            }
-        })
+        with stage("plotly_chart"):
+            st.plotly_chart(fig, use_container_width=True, config={
+                'toImageButtonOptions': {
+                    'format': 'svg', 
+                    'filename': 'npv_irr_chart',
+                    'width': 1000,   # Adjusted for better proportion
+                    'height': 600,   # Match the displayed chart height
+                    'scale': 2       # Maintain quality without scaling issues
+                }
+            })
         
         # Results section
         if irr_valid:
@@ -456,6 +374,78 @@ if valid_input:
         
         st.markdown('</div>', unsafe_allow_html=True)
         
+        # Monte Carlo simulation of NPV and IRR under uncertain cash flows
+        with st.expander("🎲 Monte Carlo Simulation", expanded=False):
+            mc_col1, mc_col2 = st.columns(2)
+            with mc_col1:
+                volatility = st.slider(
+                    "Cash flow volatility (%):",
+                    min_value=1,
+                    max_value=50,
+                    value=10,
+                    help="Standard deviation of each future cash flow, relative to the value entered"
+                )
+            with mc_col2:
+                n_scenarios = st.selectbox(
+                    "Number of scenarios:",
+                    options=[10_000, 50_000, 100_000],
+                    format_func=lambda n: f"{n:,}",
+                    help="The simulation runs inside the page; for millions of scenarios use npv_irr.simulate(..., workers=None)"
+                )
+            
+            if st.button("▶️ Run Simulation"):
+                # Reproducible (fixed seed) and cached, so reruns show the same distribution instantly
+                with stage("monte_carlo"), st.spinner(f"Simulating {n_scenarios:,} scenarios..."):
+                    simulation = computation_cache.get_or_compute(
+                        ("simulation", cf_key, volatility, n_scenarios),
+                        simulate, cash_flows, volatility / 100, n_scenarios, rate=0.10, seed=0
+                    )
+                
+                sim_col1, sim_col2, sim_col3 = st.columns(3)
+                with sim_col1:
+                    st.metric("Mean NPV at 10%", f"€{simulation['npv_mean']:,.2f}")
+                with sim_col2:
+                    st.metric("NPV Std. Deviation", f"€{simulation['npv_std']:,.2f}")
+                with sim_col3:
+                    st.metric("P(NPV < 0)", f"{simulation['prob_npv_negative']:.2%}")
+                
+                quantile_rows = "".join(
+                    f"| {q:.0%} | €{value:,.2f} |\n" for q, value in simulation["npv_quantiles"].items()
+                )
+                st.markdown("| Percentile | NPV at 10% |\n|---|---|\n" + quantile_rows)
+                
+                edges = simulation["irr_bin_edges"]
+                st.markdown("**Distribution of IRRs across scenarios**")
+                st.bar_chart(
+                    {
+                        "IRR (%)": [50 * (lo + hi) for lo, hi in zip(edges[:-1], edges[1:])],
+                        "Scenarios": simulation["irr_histogram"],
+                    },
+                    x="IRR (%)",
+                    y="Scenarios"
+                )
+                st.caption(
+                    f"{simulation['scenarios_with_one_irr']:,} scenarios with one IRR, "
+                    f"{simulation['scenarios_with_multiple_irrs']:,} with several, "
+                    f"{simulation['scenarios_without_irr']:,} with none between 0% and 100%"
+                )
+        
+        # Sensitivity of the NPV at 10% to each cash flow and to the rate
+        with st.expander("🌪️ Sensitivity Analysis", expanded=False):
+            with stage("sensitivity"):
+                base_npv, tornado_rows = tornado(cash_flows, rate=0.10)
+                sensitivities = computation_cache.get_or_compute(
+                    ("sensitivity", cf_key), sensitivity_csv, cash_flows, 0.10, irrs
+                )
+            st.markdown("Effect on the NPV at 10% of changing each cash flow by ±10% and the discount rate by ±1 percentage point:")
+            st.plotly_chart(build_tornado_figure(base_npv, tornado_rows), use_container_width=True)
+            st.download_button(
+                "📥 Download Sensitivities (CSV)",
+                data=sensitivities,
+                file_name="npv_irr_sensitivities.csv",
+                mime="text/csv"
+            )
+        
         # Add additional information about the results
         with st.expander("📈 NPV Interpretation", expanded=False):
             st.markdown("""
@@ -498,5 +488,72 @@ if valid_input:
             - The simple IRR won't work, if the discount rate changes over time
             """)
 
+# Compare mutually exclusive projects: all NPV profiles on one shared grid, crossover rates from the difference series
+with st.expander("⚖️ Compare Projects", expanded=False):
+    projects_input = st.text_area(
+        "Enter one project per line, optionally named (e.g., Project A: -1000, 800, 300):",
+        height=150,
+        placeholder="Project A: -1000, 800, 300\nProject B: -1000, 100, 100, 1300"
+    )
+    if projects_input.strip():
+        try:
+            with stage("compare_parse"):
+                project_names, projects = parse_projects(projects_input)
+        except ParseError as error:
+            st.markdown(parse_error_html(error), unsafe_allow_html=True)
+        else:
+            if len(projects) < 2:
+                st.info("Enter at least two projects to compare them.")
+            else:
+                with stage("compare"):
+                    compare_rates, profiles, crossovers = computation_cache.get_or_compute(
+                        ("compare", tuple(cash_flow_key(p) for p in projects), min_rate_dec, max_rate_dec, num_points),
+                        compare_projects, projects, min_rate_dec, max_rate_dec, num_points
+                    )
+                st.plotly_chart(
+                    build_comparison_figure(project_names, compare_rates, profiles, crossovers, min_rate, max_rate),
+                    use_container_width=True
+                )
+            
+                npvs_at_standard = [compute_npv(p, 0.10) for p in projects]
+                best = max(range(len(projects)), key=npvs_at_standard.__getitem__)
+                st.markdown(f"**Highest NPV at 10%:** {html.escape(project_names[best])} (€{npvs_at_standard[best]:,.2f})")
+                if crossovers:
+                    st.markdown(f"**Crossover (Fisher) rates between {min_rate}% and {max_rate}%** — the ranking of the two projects flips at each:")
+                    st.dataframe({
+                        "Projects": [f"{project_names[i]} / {project_names[j]}" for i, j, _, _ in crossovers],
+                        "Fisher rate (%)": [rate * 100 for _, _, rate, _ in crossovers],
+                        "NPV (€)": [npv for _, _, _, npv in crossovers],
+                    }, hide_index=True, use_container_width=True)
+                else:
+                    st.markdown(f"No crossover rates between {min_rate}% and {max_rate}%: the ranking of the projects is the same at every rate in the range.")
+
+# Browse a result store written by `python -m npv_irr.batch ... --format store`; only the shown page is read
+with st.expander("🗄️ Batch Results", expanded=False):
+    store_path = st.text_input("Result store directory:", help="Written by: python -m npv_irr.batch projects.csv results/ --format store")
+    if store_path:
+        try:
+            store = ResultStore(store_path)
+        except (OSError, ValueError) as error:
+            st.markdown(f'<div class="warning-box">Cannot open the result store: {html.escape(str(error))}</div>', unsafe_allow_html=True)
+        else:
+            store_pages = page_count(len(store))
+            store_page = 1
+            if store_pages > 1:
+                store_page = st.number_input(f"Page (of {store_pages:,}):", min_value=1, max_value=store_pages, value=1, step=1, key="store_page")
+            first = (store_page - 1) * PAGE_SIZE
+            st.dataframe(store.rows(first, first + PAGE_SIZE), hide_index=True, use_container_width=True)
+            st.caption(f"Projects {first}–{min(first + PAGE_SIZE, len(store)) - 1} of {len(store):,}, NPVs at {len(store.rates)} rates, {store.irr_values.size:,} IRRs in total")
+
+# Cache hit/miss counters for monitoring
+with st.sidebar.expander("Computation cache", expanded=False):
+    st.json(computation_cache.stats())
+
+if profiler is not None:
+    # Everything above has run; the footer adds nothing worth timing
+    record = profiler.finish(periods=len(cash_flows) if valid_input else 0)
+    profile_panel.dataframe(record["stages"], hide_index=True)
+    profile_panel.caption(f"Total: {record['total_ms']:.1f} ms")
+
 # Footer
 st.markdown('<div class="footer">NPV and IRR Visualizer | Developed by Prof. Marc Goergen with the help of ChatGPT, Perplexity and Claude</div>', unsafe_allow_html=True)
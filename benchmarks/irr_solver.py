@@ -0,0 +1,78 @@
+"""Compare the polynomial IRR solver against the original scan-and-bisect implementation.
+
+Run from the repository root:
+
+    python benchmarks/irr_solver.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from npv_irr import find_multiple_irrs  # noqa: E402
+
+
+def legacy_compute_npv(cash_flows, r):
+    return sum(cf / ((1 + r) ** t) for t, cf in enumerate(cash_flows))
+
+
+def legacy_find_multiple_irrs(cash_flows, rate_min=0.0001, rate_max=0.9999, precision=0.0001):
+    """The 10,000-point scan plus bisection previously used by the app."""
+    dense_rates = np.linspace(rate_min, rate_max, 10000)
+    dense_npvs = [legacy_compute_npv(cash_flows, r) for r in dense_rates]
+
+    zero_crossings = []
+    for i in range(1, len(dense_npvs)):
+        if dense_npvs[i-1] * dense_npvs[i] <= 0:
+            low, high = dense_rates[i-1], dense_rates[i]
+            while high - low > precision:
+                mid = (low + high) / 2
+                npv_mid = legacy_compute_npv(cash_flows, mid)
+                if npv_mid * legacy_compute_npv(cash_flows, low) <= 0:
+                    high = mid
+                else:
+                    low = mid
+            zero_crossings.append((low + high) / 2)
+
+    sign_changes = sum(1 for i in range(1, len(cash_flows)) if cash_flows[i-1] * cash_flows[i] < 0)
+
+    if len(zero_crossings) > 1:
+        filtered = [zero_crossings[0]]
+        for irr in zero_crossings[1:]:
+            if min(abs(irr - existing) for existing in filtered) > 0.01:
+                filtered.append(irr)
+        zero_crossings = filtered
+
+    return zero_crossings, sign_changes
+
+
+def best_time(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    rng = np.random.default_rng(0)
+    cases = {
+        "template (5)": [-1000, 300, 400, 500, 600],
+        "two IRRs (3)": [-100, 230, -132],
+        "conventional (120)": np.r_[-5000.0, rng.uniform(50, 150, 119)].tolist(),
+        "conventional (1000)": np.r_[-50000.0, rng.uniform(50, 150, 999)].tolist(),
+    }
+    print(f"{'case':<22}{'legacy (s)':>12}{'new (s)':>12}{'speed-up':>10}  IRRs (new)")
+    for name, cash_flows in cases.items():
+        legacy_time, _ = best_time(legacy_find_multiple_irrs, cash_flows, repeat=1)
+        new_time, (irrs, _) = best_time(find_multiple_irrs, cash_flows)
+        print(f"{name:<22}{legacy_time:>12.4f}{new_time:>12.4f}{legacy_time / new_time:>9.0f}x  "
+              + ", ".join(f"{irr:.10f}" for irr in irrs))
+
+
+if __name__ == "__main__":
+    main()
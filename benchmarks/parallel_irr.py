@@ -0,0 +1,42 @@
+"""Throughput of the sharded IRR search on a synthetic portfolio for 1..N workers.
+
+Run from the repository root:
+
+    python benchmarks/parallel_irr.py [projects] [max_workers]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from npv_irr.npv import pad_cash_flows  # noqa: E402
+from npv_irr.parallel import default_workers, find_irrs_parallel  # noqa: E402
+
+
+def synthetic_portfolio(n_projects, seed=0):
+    """Ragged projects with an initial outlay and noisy, sometimes negative, inflows."""
+    rng = np.random.default_rng(seed)
+    return [np.r_[-rng.uniform(500, 1500), rng.uniform(-80, 150, rng.integers(10, 240))]
+            for _ in range(n_projects)]
+
+
+def main():
+    n_projects = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else default_workers()
+    cash_flows, lengths = pad_cash_flows(synthetic_portfolio(n_projects))
+
+    print(f"{'workers':>8}{'time (s)':>12}{'projects/s':>14}{'scaling':>10}")
+    baseline = None
+    for workers in sorted({1, *range(2, max_workers + 1, 2), max_workers}):
+        start = time.perf_counter()
+        find_irrs_parallel(cash_flows, lengths, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8}{elapsed:>12.2f}{n_projects / elapsed:>14.0f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Benchmark suite for the NPV/IRR hot paths, runnable without Streamlit.
+
+Times the scalar NPV, the NPV curve on 100/500-point grids, the adaptive
+curve sampler, find_multiple_irrs, the all-roots eigenvalue solver and the
+Plotly chart construction and serialization, for conventional and
+multi-sign-change cash flows of 5 to 100,000 periods. When numpy_financial
+is installed, its single IRR is timed too for comparison. Results are
+written to JSON so runs on different versions can be compared.
+
+Run from the repository root:
+
+    python benchmarks/run.py -o before.json
+    python benchmarks/run.py -o after.json --compare before.json
+    python benchmarks/run.py --quick --filter irr
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from npv_irr import compute_npv, find_multiple_irrs, irr_roots, npv_curve  # noqa: E402
+from npv_irr.curve import IncrementalCurve  # noqa: E402
+
+LENGTHS = (5, 100, 1_000, 10_000, 100_000)
+QUICK_LENGTHS = (5, 100, 1_000)
+GRID_POINTS = (100, 500)
+
+# irr_roots and numpy_financial solve an n x n companion-matrix eigenproblem; beyond this it is impractical
+NPF_MAX_PERIODS = 1_000
+
+# Relative slow-down reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def cash_flow_series(kind, n_periods, seed=0):
+    """Synthetic series: "conventional" (one outlay, then inflows) or "multi-sign"."""
+    rng = np.random.default_rng(seed)
+    if kind == "conventional":
+        inflows = rng.uniform(50, 150, n_periods - 1)
+        return np.r_[-0.8 * inflows.sum() / (1 + 0.002 * n_periods), inflows]
+    # Outlay, inflows, and a decommissioning cost every 10 periods (several sign changes)
+    flows = rng.uniform(50, 150, n_periods)
+    flows[0] = -1000.0
+    flows[10::10] = -rng.uniform(400, 900, flows[10::10].size)
+    if n_periods <= 5:
+        flows = np.array([-1000.0, 2500.0, -1560.0, 50.0, 10.0][:n_periods])
+    return flows
+
+
+def cases(lengths, with_plotly):
+    """Yield (name, params, callable) for every benchmark."""
+    for kind in ("conventional", "multi-sign"):
+        for n in lengths:
+            cf = cash_flow_series(kind, n)
+            params = {"flows": kind, "periods": n}
+            yield "compute_npv", params, lambda cf=cf: compute_npv(cf, 0.10)
+            for points in GRID_POINTS:
+                rates = np.linspace(0.05, 0.30, points)
+                yield "npv_curve", {**params, "grid": points}, lambda cf=cf, rates=rates: npv_curve(cf, rates)
+            yield ("adaptive_curve", params,
+                   lambda cf=cf: IncrementalCurve(cf).sample(0.05, 0.30, max_points=500))
+            yield "find_multiple_irrs", params, lambda cf=cf: find_multiple_irrs(cf)
+            if n <= NPF_MAX_PERIODS:
+                yield "irr_roots", params, lambda cf=cf: irr_roots(cf)
+                yield "npf_irr", params, lambda cf=cf: _npf_irr(cf)
+            if with_plotly:
+                rates = np.linspace(0.05, 0.30, 500)
+                npvs = npv_curve(cf, rates)
+                irrs = find_multiple_irrs(cf)[0]
+                yield ("figure_json", {**params, "grid": 500},
+                       lambda cf=cf, rates=rates, npvs=npvs, irrs=irrs: _figure_json(cf, rates, npvs, irrs))
+                yield ("figure_update", {**params, "grid": 500}, _figure_update(cf, rates, npvs, irrs))
+
+
+def _npf_irr(cash_flows):
+    import numpy_financial as npf
+    return npf.irr(cash_flows)
+
+
+def _figure_json(cash_flows, rates, npv_values, irrs):
+    from npv_irr.plotting import build_npv_figure
+    return build_npv_figure(cash_flows, rates, npv_values, irrs, 5, 30).to_json()
+
+
+def _figure_update(cash_flows, rates, npv_values, irrs):
+    """A rerun after a slider move: patch a kept figure with a shifted curve, then serialize it."""
+    from npv_irr.plotting import NPVFigure
+    figure = NPVFigure()
+    curves = [(rates, npv_values), (rates[1:], npv_values[1:])]
+    state = {"turn": 0}
+
+    def update():
+        state["turn"] ^= 1
+        curve_rates, curve_npvs = curves[state["turn"]]
+        return figure.update(cash_flows, curve_rates, curve_npvs, irrs, 5, 30).to_json()
+    return update
+
+
+def measure(fn, repeat, min_time=0.2):
+    """Return per-call timings (seconds) over ``repeat`` runs of an auto-ranged loop."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    if elapsed > min_time:
+        number = max(1, int(number * min_time / elapsed))
+    return [t / number for t in timer.repeat(repeat=repeat, number=number)], number
+
+
+def _available(module):
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(lengths, repeat, name_filter=None):
+    with_plotly = _available("plotly")
+    with_npf = _available("numpy_financial")
+    results = []
+    for name, params, fn in cases(lengths, with_plotly):
+        if name_filter and name_filter not in name:
+            continue
+        if name == "npf_irr" and not with_npf:
+            continue
+        timings, number = measure(fn, repeat)
+        result = {
+            "name": name,
+            "params": params,
+            "number": number,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+        }
+        results.append(result)
+        print(f"{name:<20}{_format_params(params):<44}{result['min'] * 1e3:>12.3f} ms")
+    return {
+        "metadata": {
+            "revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def _format_params(params):
+    return " ".join(f"{key}={value}" for key, value in params.items())
+
+
+def _key(result):
+    return result["name"], tuple(sorted(result["params"].items()))
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Print the change of every benchmark present in both runs; return the regressions."""
+    previous = {_key(result): result for result in baseline["results"]}
+    regressions = []
+    print(f"\n{'benchmark':<64}{'before (ms)':>12}{'after (ms)':>12}{'change':>9}")
+    for result in current["results"]:
+        old = previous.get(_key(result))
+        if old is None:
+            continue
+        change = result["min"] / old["min"] - 1
+        flag = "  <-- slower" if change > threshold else ""
+        print(f"{result['name'] + ' ' + _format_params(result['params']):<64}"
+              f"{old['min'] * 1e3:>12.3f}{result['min'] * 1e3:>12.3f}{change:>+9.1%}{flag}")
+        if change > threshold:
+            regressions.append(result)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the NPV/IRR computations.")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--quick", action="store_true", help=f"only series of {QUICK_LENGTHS} periods")
+    parser.add_argument("--filter", help="only benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats per benchmark")
+    args = parser.parse_args(argv)
+
+    report = run(QUICK_LENGTHS if args.quick else LENGTHS, args.repeat, args.filter)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
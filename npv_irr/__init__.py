@@ -0,0 +1,93 @@
+"""NPV and IRR computations used by the NPV and IRR Visualizer.
+
+Importing the package only loads NumPy and the core NPV/IRR kernels, so
+batch jobs and worker processes start quickly. Everything else (parsing,
+caching, batch and parallel helpers, and the Plotly charts) is imported on
+first attribute access.
+"""
+import importlib
+
+from .irr import (
+    count_sign_changes,
+    find_irrs,
+    find_irrs_batch,
+    find_multiple_irrs,
+    irr_roots,
+    irr_roots_batch,
+    irr_summary,
+    irr_summary_batch,
+)
+from .npv import compute_npv, discount_factors, npv_curve, npv_matrix, pad_cash_flows
+
+# Public names loaded on demand: name -> submodule defining it
+_LAZY_ATTRIBUTES = {
+    "ComputationCache": "cache",
+    "cash_flow_key": "cache",
+    "compare_projects": "compare",
+    "crossover_rates": "compare",
+    "npv_profiles": "compare",
+    "IncrementalCurve": "curve",
+    "adaptive_sample": "curve",
+    "simulate": "montecarlo",
+    "find_irrs_parallel": "parallel",
+    "iter_irrs_parallel": "parallel",
+    "ParseError": "parsing",
+    "parse_cash_flows": "parsing",
+    "parse_projects": "parsing",
+    "NPVFigure": "plotting",
+    "build_comparison_figure": "plotting",
+    "build_npv_figure": "plotting",
+    "build_tornado_figure": "plotting",
+    "Profiler": "profiling",
+    "profiling_enabled": "profiling",
+    "set_profiler": "profiling",
+    "stage": "profiling",
+    "irr_sensitivities": "sensitivity",
+    "npv_sensitivities": "sensitivity",
+    "sensitivity_csv": "sensitivity",
+    "tornado": "sensitivity",
+    "ResultStore": "store",
+    "write_store": "store",
+    "cash_flow_table_html": "table",
+    "npv_forward_curves": "term_structure",
+    "xirr": "term_structure",
+    "xnpv": "term_structure",
+    "xnpv_curves": "term_structure",
+}
+_LAZY_SUBMODULES = {
+    "batch", "cache", "compare", "curve", "montecarlo", "parallel", "parsing", "plotting", "profiling", "sensitivity",
+    "service", "store", "table", "term_structure",
+}
+
+__all__ = [
+    "compute_npv",
+    "count_sign_changes",
+    "discount_factors",
+    "find_irrs",
+    "find_irrs_batch",
+    "find_multiple_irrs",
+    "irr_roots",
+    "irr_roots_batch",
+    "irr_summary",
+    "irr_summary_batch",
+    "npv_curve",
+    "npv_matrix",
+    "pad_cash_flows",
+    *sorted(_LAZY_ATTRIBUTES),
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+        value = getattr(module, name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _LAZY_SUBMODULES)
@@ -0,0 +1,231 @@
+"""Batch portfolio mode: NPV and IRRs for every project in a file.
+
+Each input row is one project's cash flows (period 0 first). A CSV row
+whose first cell is not a number takes it as the project id; numeric ids
+(e.g. 1001) would be read as the period-0 cash flow, so pass
+``--id-column`` to always take the first cell as the id. Empty cells at the
+end of a row are ignored, and an empty cell inside a row is an error.
+Parquet files need either a list column named ``cash_flows`` or one numeric
+column per period (trailing nulls end a shorter project; a null inside one
+is an error). As in the app, nan, inf and values too large for a float are
+rejected.
+
+Each project's IRRs are the ones the app shows for it: every IRR in
+[--irr-min, --irr-max] (by default the app's 0.01% to 99.99%), plus, for
+projects of up to ``ALL_ROOTS_MAX_PERIODS`` (150) periods, the IRRs outside
+that range. ``--all-roots`` reports every real IRR of every project instead.
+
+Usage:
+
+    python -m npv_irr.batch projects.csv results.csv --rates 0.05,0.10,0.15
+    python -m npv_irr.batch projects.parquet results/ --format store --rates 0:0.5:101
+
+``--format store`` writes a memory-mapped result store (see
+:mod:`npv_irr.store`) instead of CSV, for portfolios too large to handle as
+text.
+"""
+import argparse
+import csv
+import os
+
+import numpy as np
+
+from .irr import count_sign_changes, irr_roots_batch, irr_summary_batch
+from .npv import npv_matrix, pad_cash_flows
+from .parallel import iter_irrs_parallel
+from .parsing import _parse_token
+from .store import write_store
+
+# Projects evaluated per vectorized block; bounds the size of the scan matrices
+CHUNK_ROWS = 1024
+
+
+def _is_number(token):
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def read_csv(path, id_column=None):
+    """Read one project per row. Returns (ids, list of float arrays).
+
+    ``id_column`` None takes the first cell as the id only when it is not a
+    number; True always does, False never does.
+    """
+    ids, series = [], []
+    with open(path, newline="") as f:
+        for row_number, row in enumerate(csv.reader(f), start=1):
+            tokens = [token.strip() for token in row]
+            while tokens and not tokens[-1]:
+                tokens.pop()
+            if not tokens:
+                continue
+            first = 0
+            if id_column or (id_column is None and not _is_number(tokens[0])):
+                ids.append(tokens[0])
+                first = 1
+            else:
+                ids.append(str(len(ids)))
+            values = []
+            for column, token in enumerate(tokens[first:], start=first + 1):
+                # Same rules as the app's parser: nan, inf and overflowing values are rejected
+                value, reason = _parse_token(token)
+                if not token:
+                    raise ValueError(f"{path}: row {row_number}, column {column} is empty "
+                                     "(enter 0 for a period without a cash flow)")
+                if reason:
+                    raise ValueError(f"{path}: row {row_number}, column {column} is {reason}: {token!r}")
+                values.append(value)
+            series.append(np.array(values))
+    return ids, series
+
+
+def read_parquet(path):
+    """Read one project per row from a Parquet file. Returns (ids, list of float arrays)."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Reading Parquet files requires pyarrow (pip install pyarrow)") from exc
+
+    table = pq.read_table(path)
+    ids = [str(i) for i in range(table.num_rows)]
+    if "id" in table.column_names:
+        ids = [str(x) for x in table.column("id").to_pylist()]
+    if "cash_flows" in table.column_names:
+        series = [np.array(row, dtype=float) for row in table.column("cash_flows").to_pylist()]
+    else:
+        columns = [name for name in table.column_names if name != "id"]
+        wide = np.column_stack([
+            table.column(name).to_numpy(zero_copy_only=False).astype(float) for name in columns
+        ])
+        series = []
+        for i, row in enumerate(wide):
+            # Trailing nulls pad a shorter project; a null before its last value would shift the periods
+            present = ~np.isnan(row)
+            length = np.flatnonzero(present)[-1] + 1 if present.any() else 0
+            if not present[:length].all():
+                column = columns[np.flatnonzero(~present[:length])[0]]
+                raise ValueError(f"{path}: row {i + 1} has no value in column {column!r} before its last cash flow")
+            series.append(row[:length])
+    for i, cash_flows in enumerate(series):
+        if not np.isfinite(cash_flows).all():
+            period = np.flatnonzero(~np.isfinite(cash_flows))[0]
+            raise ValueError(f"{path}: row {i + 1}, period {period} is not a finite number: {cash_flows[period]}")
+    return ids, series
+
+
+def read_cash_flows(path, id_column=None):
+    """Read a CSV or Parquet portfolio file (chosen by extension); ``id_column`` applies to CSV."""
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        return read_parquet(path)
+    return read_csv(path, id_column)
+
+
+def evaluate_portfolio(cash_flows, lengths, rates, rate_min=0.0001, rate_max=0.9999,
+                       chunk_rows=CHUNK_ROWS, workers=1, all_roots=False):
+    """Yield (npvs, irrs, sign_changes) for each row of a padded cash-flow matrix.
+
+    NPVs at ``rates`` come from the same kernel as the app's curve and the
+    IRRs are the ones the app reports (:func:`irr_summary_batch`: those in
+    [rate_min, rate_max], plus those outside it for projects of up to
+    ``ALL_ROOTS_MAX_PERIODS`` periods), evaluated in blocks of ``chunk_rows``
+    projects. With ``workers`` > 1 the blocks' IRRs are solved on a process
+    pool (``None`` uses every CPU), a few blocks ahead of the rows being
+    yielded. With ``all_roots`` every real IRR above -100% of every project,
+    however long, comes from :func:`irr_roots_batch` instead, in-process and
+    ignoring the search range.
+    """
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))
+    irr_blocks = None
+    if workers != 1 and not all_roots:
+        irr_blocks = iter_irrs_parallel(cash_flows, lengths, rate_min, rate_max, workers=workers,
+                                        chunk_rows=chunk_rows, solver=irr_summary_batch)
+    try:
+        for start in range(0, cash_flows.shape[0], chunk_rows):
+            block = cash_flows[start:start + chunk_rows]
+            block_lengths = lengths[start:start + chunk_rows]
+            npvs = npv_matrix(block, rates)
+            if all_roots:
+                irrs = irr_roots_batch(block, block_lengths)
+            elif irr_blocks is None:
+                irrs = irr_summary_batch(block, block_lengths, rate_min, rate_max)
+            else:
+                irrs = next(irr_blocks)
+            for i in range(block.shape[0]):
+                yield npvs[i], irrs[i], count_sign_changes(block[i, :block_lengths[i]])
+    finally:
+        # Stops the pool and frees the shared memory if the caller stops early
+        if irr_blocks is not None:
+            irr_blocks.close()
+
+
+def write_results(path, ids, rates, results):
+    """Write one CSV row per project: id, NPV at each rate, IRR count, IRRs, sign changes."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id"] + [f"npv@{rate:g}" for rate in rates]
+                        + ["irr_count", "irrs", "sign_changes"])
+        for project_id, (npvs, irrs, sign_changes) in zip(ids, results):
+            writer.writerow([project_id] + [repr(float(x)) for x in npvs]
+                            + [len(irrs), ";".join(repr(irr) for irr in irrs), sign_changes])
+
+
+def run(input_path, output_path, rates, rate_min=0.0001, rate_max=0.9999, workers=1, all_roots=False,
+        output_format="csv", id_column=None):
+    """Read a portfolio, evaluate every project and write the results (CSV or a result store) in one pass."""
+    ids, series = read_cash_flows(input_path, id_column)
+    cash_flows, lengths = pad_cash_flows(series)
+    results = evaluate_portfolio(cash_flows, lengths, rates, rate_min, rate_max, workers=workers,
+                                 all_roots=all_roots)
+    if output_format == "store":
+        write_store(output_path, ids, rates, results)
+    else:
+        write_results(output_path, ids, rates, results)
+    return len(ids)
+
+
+def _parse_rates(text):
+    """Comma-separated rates, or start:stop:count for an evenly spaced grid."""
+    if ":" in text:
+        start, stop, count = text.split(":")
+        return np.linspace(float(start), float(stop), int(count)).tolist()
+    return [float(x) for x in text.split(",") if x.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate NPV and IRRs for a portfolio of projects.")
+    parser.add_argument("input", help="CSV or Parquet file with one project's cash flows per row")
+    parser.add_argument("output", help="CSV file (or result store directory) to write the results to")
+    parser.add_argument("--rates", type=_parse_rates, default=[0.10],
+                        help="comma-separated discount rates (decimals) for the NPV columns, "
+                             "or start:stop:count for a grid")
+    parser.add_argument("--irr-min", type=float, default=0.0001,
+                        help="lowest IRR searched for (default: the app's 0.01%%)")
+    parser.add_argument("--irr-max", type=float, default=0.9999,
+                        help="highest IRR searched for (default: the app's 99.99%%)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for the IRR search (0 = one per CPU)")
+    parser.add_argument("--all-roots", action="store_true",
+                        help="find every real IRR above -100%% of every project, however long, from "
+                             "companion-matrix eigenvalues (ignores --irr-min, --irr-max and --workers)")
+    parser.add_argument("--id-column", action="store_true", default=None,
+                        help="always read the first CSV cell of a row as the project id, even if numeric")
+    parser.add_argument("--format", choices=("csv", "store"), default="csv",
+                        help="CSV text, or a memory-mapped result store directory")
+    args = parser.parse_args(argv)
+    if not args.all_roots and not -1 < args.irr_min < args.irr_max:
+        parser.error("need -1 < --irr-min < --irr-max")
+
+    try:
+        count = run(args.input, args.output, args.rates, args.irr_min, args.irr_max,
+                    workers=args.workers or None, all_roots=args.all_roots,
+                    output_format=args.format, id_column=args.id_column)
+    except ValueError as exc:
+        parser.exit(1, f"error: {exc}\n")
+    print(f"Evaluated {count} projects -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
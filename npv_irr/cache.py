@@ -0,0 +1,87 @@
+"""Bounded memoization of NPV/IRR results across Streamlit reruns.
+
+Streamlit re-executes the whole script on every widget interaction. Results
+are keyed on a digest of the cash flows plus the rate settings, so an
+unchanged input is served without recomputation.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+def cash_flow_key(cash_flows):
+    """Return a short, stable digest of a cash-flow series (independent of its length)."""
+    data = np.ascontiguousarray(cash_flows, dtype=np.float64)
+    return hashlib.blake2b(data.tobytes(), digest_size=16).hexdigest()
+
+
+class ComputationCache:
+    """Thread-safe bounded cache with hit/miss/eviction counters.
+
+    ``policy`` is ``"lru"`` (a hit refreshes the entry) or ``"fifo"``
+    (entries are evicted in insertion order regardless of use).
+    """
+
+    def __init__(self, maxsize=32, policy="lru"):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"policy must be one of {EVICTION_POLICIES}, not {policy!r}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache sized by NPV_IRR_CACHE_SIZE and NPV_IRR_CACHE_POLICY."""
+        return cls(
+            maxsize=int(os.environ.get("NPV_IRR_CACHE_SIZE", 32)),
+            policy=os.environ.get("NPV_IRR_CACHE_POLICY", "lru").lower(),
+        )
+
+    def get_or_compute(self, key, compute, *args, **kwargs):
+        """Return the cached value for ``key``, calling ``compute(*args, **kwargs)`` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                if self.policy == "lru":
+                    self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute(*args, **kwargs)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the counters as a dict, for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "policy": self.policy,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,57 @@
+"""Side-by-side comparison of mutually exclusive projects.
+
+All NPV profiles are evaluated on one shared rate grid in a single matrix
+evaluation of the zero-padded projects. The crossover (Fisher) rate of two
+projects is an IRR of the difference of their cash flows, so the difference
+series of every pair are stacked and handed to the batched root finder in
+one go.
+"""
+from itertools import combinations
+
+import numpy as np
+
+from .irr import find_irrs_batch
+from .npv import discount_factors, npv_matrix, pad_cash_flows
+
+# Project pairs whose difference series are solved together
+PAIR_CHUNK_ROWS = 1024
+
+
+def npv_profiles(series, rates):
+    """NPV of every project (rows) at every rate (columns) of a shared grid."""
+    matrix, _ = pad_cash_flows(series)
+    return npv_matrix(matrix, rates)
+
+
+def crossover_rates(series, rate_min=0.0001, rate_max=0.9999, tol=1e-10):
+    """Return (i, j, rate, npv) for every rate in [rate_min, rate_max] where projects i < j have equal NPVs.
+
+    ``npv`` is the NPV both projects share there. Sorted by rate.
+    """
+    if len(series) < 2:
+        return []
+    matrix, lengths = pad_cash_flows(series)
+    first, second = (np.array(index, dtype=int) for index in zip(*combinations(range(len(series)), 2)))
+
+    crossovers = []
+    for start in range(0, first.size, PAIR_CHUNK_ROWS):
+        i, j = first[start:start + PAIR_CHUNK_ROWS], second[start:start + PAIR_CHUNK_ROWS]
+        differences = matrix[i] - matrix[j]
+        pair_lengths = np.maximum(lengths[i], lengths[j])
+        for a, b, roots in zip(i, j, find_irrs_batch(differences, pair_lengths, rate_min, rate_max, tol)):
+            crossovers.extend((int(a), int(b), rate) for rate in roots)
+    if not crossovers:
+        return []
+
+    # One discount-factor row per crossover, applied to the first project of its pair
+    rates = np.array([rate for _, _, rate in crossovers])
+    factors = discount_factors(rates, np.arange(matrix.shape[1]))
+    shared = np.einsum("kt,kt->k", factors, matrix[[a for a, _, _ in crossovers]])
+    rows = [(a, b, rate, float(npv)) for (a, b, rate), npv in zip(crossovers, shared)]
+    return sorted(rows, key=lambda row: row[2])
+
+
+def compare_projects(series, rate_min, rate_max, points=500):
+    """Return (rates, NPV profiles, crossovers) on a ``points``-rate grid over [rate_min, rate_max]."""
+    rates = np.linspace(rate_min, rate_max, points)
+    return rates, npv_profiles(series, rates), crossover_rates(series, rate_min, rate_max)
@@ -0,0 +1,128 @@
+"""NPV curves that are evaluated incrementally as the rate range changes."""
+import threading
+
+import numpy as np
+
+from .npv import npv_curve
+
+# Spacing of the rate lattice on which NPVs are stored (0.01 percentage points)
+LATTICE_STEP = 1e-4
+
+
+class IncrementalCurve:
+    """NPV curve of one cash-flow series, filled in on demand on a fixed rate lattice.
+
+    Every NPV is evaluated exactly on the lattice and kept, so moving the
+    rate slider only evaluates lattice points that were never needed before.
+    Requested rates that fall between lattice points are linearly
+    interpolated from their two neighbours.
+    """
+
+    def __init__(self, cash_flows, step=LATTICE_STEP):
+        self.cash_flows = np.asarray(cash_flows, dtype=float)
+        self.step = step
+        self.evaluations = 0
+        self._first = 0
+        self._values = np.empty(0)
+        self._lock = threading.Lock()
+
+    def _fill(self, indices):
+        """Evaluate the lattice points in ``indices`` that are not stored yet."""
+        lo, hi = int(indices.min()), int(indices.max())
+        if self._values.size == 0:
+            self._first = lo
+            self._values = np.full(hi - lo + 1, np.nan)
+        elif lo < self._first or hi >= self._first + self._values.size:
+            first = min(lo, self._first)
+            grown = np.full(max(hi, self._first + self._values.size - 1) - first + 1, np.nan)
+            grown[self._first - first:self._first - first + self._values.size] = self._values
+            self._first, self._values = first, grown
+
+        offsets = indices - self._first
+        missing = offsets[np.isnan(self._values[offsets])]
+        if missing.size:
+            self._values[missing] = npv_curve(self.cash_flows, (missing + self._first) * self.step)
+            self.evaluations += missing.size
+
+    def npv(self, rates):
+        """Return the NPV at every rate in ``rates``."""
+        position = np.asarray(rates, dtype=float) / self.step
+        nearest = np.round(position)
+        on_lattice = np.isclose(position, nearest, rtol=0, atol=1e-9)
+        position = np.where(on_lattice, nearest, position)
+        below = np.floor(position).astype(np.int64)
+        fraction = position - below
+
+        with self._lock:
+            self._fill(np.unique(np.concatenate((below, below[~on_lattice] + 1))))
+            low = self._values[below - self._first]
+            high = self._values[np.where(on_lattice, below, below + 1) - self._first]
+        return low + fraction * (high - low)
+
+    def sample(self, rate_min, rate_max, roots=(), **options):
+        """Adaptively sample the curve on its lattice; see :func:`adaptive_sample`."""
+        return adaptive_sample(self.npv, rate_min, rate_max, roots, step=self.step, **options)
+
+
+def adaptive_sample(npv, rate_min, rate_max, roots=(), width_px=1000, height_px=600,
+                    pixel_tolerance=0.5, initial_points=17, max_points=500, step=None):
+    """Sample an NPV curve densely only where a straight line would not do.
+
+    Starts from ``initial_points`` evenly spaced rates plus every root in the
+    range (with NPV exactly 0), then repeatedly bisects intervals whose
+    midpoint is further than ``pixel_tolerance`` pixels from the chord, for a
+    chart of ``width_px`` x ``height_px``. Intervals narrower than a pixel
+    are never split, and at most ``max_points`` rates are returned. With a
+    lattice ``step`` every new rate is snapped to the lattice.
+
+    ``npv`` maps an array of rates to NPVs. Returns (rates, npvs), sorted.
+    """
+    def snap(x):
+        return np.round(x / step) * step if step else x
+
+    rates = np.unique(np.clip(snap(np.linspace(rate_min, rate_max, initial_points)), rate_min, rate_max))
+    values = npv(rates)
+    roots = np.asarray([r for r in roots if rate_min < r < rate_max], dtype=float)
+    if roots.size:
+        rates = np.concatenate((rates, roots))
+        values = np.concatenate((values, np.zeros(roots.size)))
+        order = np.argsort(rates, kind="stable")
+        rates, values = rates[order], values[order]
+
+    min_width = max((rate_max - rate_min) / width_px, 2 * step if step else 0.0)
+    done = np.zeros(rates.size - 1, dtype=bool)
+    while rates.size < max_points:
+        open_intervals = np.flatnonzero(~done & (np.diff(rates) > min_width))
+        if open_intervals.size == 0:
+            break
+        mids = snap(0.5 * (rates[open_intervals] + rates[open_intervals + 1]))
+        inside = (mids > rates[open_intervals]) & (mids < rates[open_intervals + 1])
+        done[open_intervals[~inside]] = True
+        open_intervals, mids = open_intervals[inside], mids[inside]
+        if open_intervals.size == 0:
+            break
+
+        mid_values = npv(mids)
+        left, right = rates[open_intervals], rates[open_intervals + 1]
+        weight = (mids - left) / (right - left)
+        chord = (1 - weight) * values[open_intervals] + weight * values[open_intervals + 1]
+        error = np.abs(mid_values - chord)
+        y_tolerance = pixel_tolerance * max(np.ptp(values), np.finfo(float).tiny) / height_px
+        split = error > y_tolerance
+        done[open_intervals[~split]] = True
+        if not split.any():
+            break
+
+        # Spend what is left of the point budget on the worst intervals first
+        budget = max_points - rates.size
+        chosen = np.flatnonzero(split)
+        if chosen.size > budget:
+            chosen = chosen[np.argsort(error[chosen])[::-1][:budget]]
+            chosen.sort()
+        at = open_intervals[chosen] + 1
+        rates = np.insert(rates, at, mids[chosen])
+        values = np.insert(values, at, mid_values[chosen])
+        # Split intervals were left open; their new right halves start open too
+        done = np.insert(done, at, False)
+
+    return rates, values
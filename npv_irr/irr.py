@@ -0,0 +1,395 @@
+"""IRR root finding on the NPV polynomial.
+
+With v = 1 / (1 + r) the NPV is the polynomial sum(CF_t * v ** t), so its
+value and derivatives at any rate come from one shared vector of discount
+factors. Roots are isolated on a vectorized rate scan (sign changes of the
+NPV plus turning points that dip through zero inside a single scan cell)
+and refined with safeguarded Newton iterations.
+"""
+import numpy as np
+
+from .npv import BLOCK_ELEMENTS, npv_matrix
+
+# Number of rates in the vectorized scan used to isolate the roots
+SCAN_POINTS = 512
+
+# Companion-matrix eigenvalues with a relative imaginary part up to this are taken as real
+# (a double root splits into a complex pair of about the square root of machine precision)
+IMAG_TOL = 1e-6
+
+# Largest |NPV| relative to the NPV of |cash flows| accepted at a polished eigenvalue root
+ROOT_RESIDUAL = 1e-9
+
+# Polished roots closer than this (relative to max(1, |r|)) are one multiple root, which
+# Newton only pins down to about the square root of machine precision
+ROOT_MERGE_TOL = 1e-6
+
+# Longest series whose IRRs irr_summary completes with the O(n ** 3) all-roots solver
+# (about 20 ms at 150 periods, but seconds at 1000: too slow to run on every new input)
+ALL_ROOTS_MAX_PERIODS = 150
+
+
+def count_sign_changes(cash_flows):
+    """Count sign changes between consecutive cash flows."""
+    cf = np.asarray(cash_flows, dtype=float)
+    return int(np.count_nonzero(cf[1:] * cf[:-1] < 0))
+
+
+def scan_npv_and_slope(cash_flows, rates):
+    """Return the NPV and its slope for every series (rows) at every rate in one batched pass.
+
+    ``cash_flows`` is 2D with one zero-padded series per row; both results
+    have shape (series, rates).
+    """
+    cf = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    n_series, n_periods = cf.shape
+    # dNPV/dr = -sum(t * CF_t * v ** (t + 1)): the NPV of -t * CF_t shifted by one period
+    stacked = np.zeros((2 * n_series, n_periods + 1))
+    stacked[:n_series, :-1] = cf
+    stacked[n_series:, 1:] = -np.arange(n_periods) * cf
+    scanned = npv_matrix(stacked, rates)
+    return scanned[:n_series], scanned[n_series:]
+
+
+class _NPVPolynomial:
+    """NPV of one series and its first two derivatives with respect to the rate.
+
+    ``times`` are the cash flows' times in periods (0, 1, 2, ... by default);
+    fractional times (dated cash flows) are handled the same way.
+    """
+
+    def __init__(self, cash_flows, times=None):
+        self.cf = np.asarray(cash_flows, dtype=float)
+        self.t = np.arange(self.cf.size, dtype=float) if times is None else np.asarray(times, dtype=float)
+        self.t_cf = self.t * self.cf
+        self.t2_cf = self.t * self.t_cf
+
+    def evaluate(self, r):
+        """Return (NPV, dNPV/dr, d2NPV/dr2) at ``r`` from one discount-factor vector."""
+        v = 1.0 / (1.0 + r)
+        d = np.exp(-np.log1p(r) * self.t)
+        s0 = self.cf @ d
+        s1 = self.t_cf @ d
+        s2 = self.t2_cf @ d
+        return s0, -v * s1, v * v * (s2 + s1)
+
+    def value_and_slope(self, r):
+        f, df, _ = self.evaluate(r)
+        return f, df
+
+
+def _npv_derivatives(cf, times, x, order):
+    """NPV derivatives of orders ``order`` and ``order + 1`` for each row of ``cf`` at its rate in ``x``."""
+    v = 1.0 / (1.0 + x)
+    d = np.exp(-np.log1p(x)[:, None] * times)
+    s1 = np.einsum("ij,ij->i", cf * times, d)
+    if order == 0:
+        return np.einsum("ij,ij->i", cf, d), -v * s1
+    s2 = np.einsum("ij,ij->i", cf * (times * times), d)
+    return -v * s1, v * v * (s2 + s1)
+
+
+def _rows_in_blocks(times, count):
+    """Slices of at most BLOCK_ELEMENTS // len(times) brackets."""
+    block = max(1, BLOCK_ELEMENTS // max(times.size, 1))
+    return [slice(start, start + block) for start in range(0, count, block)]
+
+
+def _refine_rows(cash_flows, rows, times, lo, hi, f_lo, tol, order=0, max_iter=200):
+    """Safeguarded Newton iteration for many bracketed roots at once, elementwise.
+
+    Bracket k holds a root of the ``order``-th NPV derivative of series
+    ``cash_flows[rows[k]]`` (at ``times``) in [lo[k], hi[k]]. Newton steps
+    that leave a bracket fall back to bisection, so every bracket converges.
+    Every iteration evaluates all unconverged brackets in one vectorized
+    pass, and brackets drop out as they converge.
+    """
+    roots = np.empty(len(rows))
+    for part in _rows_in_blocks(times, len(rows)):
+        roots[part] = _refine_block(cash_flows[rows[part]], times, lo[part], hi[part], f_lo[part],
+                                    tol, order, max_iter)
+    return roots
+
+
+def _refine_block(cf, times, lo, hi, f_lo, tol, order, max_iter):
+    lo, hi, f_lo = (np.array(a, dtype=float) for a in (lo, hi, f_lo))
+    x = 0.5 * (lo + hi)
+    roots = x.copy()
+    active = np.arange(x.size)
+    for _ in range(max_iter):
+        if active.size == 0:
+            return roots
+        xa = x[active]
+        f, df = _npv_derivatives(cf[active], times, xa, order)
+
+        same = (f < 0) == (f_lo[active] < 0)
+        lo_a = np.where(same, xa, lo[active])
+        f_lo[active] = np.where(same, f, f_lo[active])
+        hi_a = np.where(same, hi[active], xa)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_new = xa - f / df
+        # Newton steps that leave the bracket (or divide by zero) fall back to bisection
+        outside = (df == 0) | ~((lo_a < x_new) & (x_new < hi_a))
+        x_new = np.where(outside, 0.5 * (lo_a + hi_a), x_new)
+
+        exact = f == 0
+        done = exact | (np.abs(x_new - xa) < tol) | (hi_a - lo_a < tol)
+        roots[active] = np.where(exact, xa, x_new)
+        lo[active], hi[active], x[active] = lo_a, hi_a, x_new
+        active = active[~done]
+    roots[active] = x[active]
+    return roots
+
+
+def _roots_from_scans(cash_flows, lengths, rates, npvs, slopes, tol, times=None):
+    """Refine every root bracketed by the scans of many series (one per row of ``npvs``/``slopes``).
+
+    Turning points, then all roots of all rows, are refined together by
+    :func:`_refine_rows`.
+    """
+    cf = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    times = np.arange(cf.shape[1], dtype=float) if times is None else np.asarray(times, dtype=float)
+    usable = (np.asarray(lengths) >= 2) & np.any(cf != 0, axis=1)
+
+    # Products of neighbouring signs: -1 across a sign change, +1 on a cell without one
+    sign = np.sign(npvs)
+    neighbours = sign[:, :-1] * sign[:, 1:]
+    slope_sign = np.sign(slopes)
+    crossings = (neighbours < 0) & usable[:, None]
+    turns = (neighbours > 0) & (slope_sign[:, :-1] * slope_sign[:, 1:] < 0) & usable[:, None]
+
+    roots = [[] for _ in range(cf.shape[0])]
+    zeros = (sign == 0) & usable[:, None]
+    if zeros.any():
+        for row, i in zip(*np.nonzero(zeros)):
+            roots[row].append(rates[i])
+
+    rows, cells = np.nonzero(crossings)
+    lo, hi, f_lo = rates[cells], rates[cells + 1], npvs[rows, cells]
+
+    # A turning point inside a cell may dip through zero (two roots) or touch it (a double root)
+    turn_rows, turn_cells = np.nonzero(turns)
+    if turn_rows.size:
+        turn_lo, turn_hi = rates[turn_cells], rates[turn_cells + 1]
+        turn = _refine_rows(cf, turn_rows, times, turn_lo, turn_hi, slopes[turn_rows, turn_cells], tol, order=1)
+        f_turn = np.empty(turn.size)
+        for part in _rows_in_blocks(times, turn.size):
+            f_turn[part] = _npv_derivatives(cf[turn_rows[part]], times, turn[part], 0)[0]
+        touches = np.abs(f_turn) <= tol * np.abs(cf).sum(axis=1)[turn_rows]
+        for row, root in zip(turn_rows[touches], turn[touches]):
+            roots[row].append(root)
+        dips = ~touches & (np.sign(f_turn) != sign[turn_rows, turn_cells])
+        dip_rows = turn_rows[dips]
+        rows = np.concatenate((rows, dip_rows, dip_rows))
+        lo = np.concatenate((lo, turn_lo[dips], turn[dips]))
+        hi = np.concatenate((hi, turn[dips], turn_hi[dips]))
+        f_lo = np.concatenate((f_lo, npvs[dip_rows, turn_cells[dips]], f_turn[dips]))
+
+    if rows.size:
+        for row, root in zip(rows, _refine_rows(cf, rows, times, lo, hi, f_lo, tol)):
+            roots[row].append(root)
+    return [_merge_roots(row_roots, tol) for row_roots in roots]
+
+
+def _merge_roots(roots, tol):
+    """Sort and merge roots that only differ by the solver tolerance."""
+    if len(roots) < 2:
+        return [float(x) for x in roots]
+    unique = []
+    for root in sorted(float(x) for x in roots):
+        if not unique or root - unique[-1] > tol:
+            unique.append(root)
+    return unique
+
+
+def _roots_from_scan(cash_flows, rates, npvs, slopes, tol, times=None):
+    """Refine every root bracketed by a scan of one series."""
+    cf = np.asarray(cash_flows, dtype=float)
+    return _roots_from_scans(cf[None, :], [cf.size], rates, npvs[None, :], slopes[None, :], tol, times)[0]
+
+
+def _check_rate_range(rate_min, rate_max):
+    # Below -100% the discount factors are undefined, and the NaN NPVs would bracket fake roots
+    if not -1 < rate_min < rate_max:
+        raise ValueError(f"need -1 < rate_min < rate_max, got rate_min={rate_min}, rate_max={rate_max}")
+
+
+def find_irrs(cash_flows, rate_min=0.0001, rate_max=0.9999, tol=1e-10, scan_points=SCAN_POINTS):
+    """Return every IRR of ``cash_flows`` in [rate_min, rate_max], sorted, to within ``tol``.
+
+    Sign changes of the NPV on the scan grid are refined directly. Scan cells
+    where the slope changes sign are checked for a turning point that crosses
+    (or touches) zero, which catches pairs of roots closer together than the
+    grid spacing as well as double roots. Raises ValueError unless
+    -1 < rate_min < rate_max.
+    """
+    _check_rate_range(rate_min, rate_max)
+    cf = np.asarray(cash_flows, dtype=float)
+    rates = np.linspace(rate_min, rate_max, scan_points)
+    npvs, slopes = scan_npv_and_slope(cf, rates)
+    return _roots_from_scan(cf, rates, npvs[0], slopes[0], tol)
+
+
+def find_irrs_batch(cash_flows, lengths=None, rate_min=0.0001, rate_max=0.9999, tol=1e-10,
+                    scan_points=SCAN_POINTS):
+    """Return the list of IRRs for every row of a zero-padded 2D cash-flow array.
+
+    The NPV scan of all rows is a single batched evaluation, and the Newton
+    refinement of every bracketed root runs vectorized across rows, with the
+    same iteration as :func:`find_irrs` (roots agree to within ``tol``).
+    ``lengths`` gives each row's number of periods.
+    """
+    _check_rate_range(rate_min, rate_max)
+    cf = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    if lengths is None:
+        lengths = np.full(cf.shape[0], cf.shape[1])
+    rates = np.linspace(rate_min, rate_max, scan_points)
+    npvs, slopes = scan_npv_and_slope(cf, rates)
+    return _roots_from_scans(cf, lengths, rates, npvs, slopes, tol)
+
+
+def _trim_polynomial(cash_flows):
+    """Coefficients of the NPV polynomial in v = 1 / (1 + r) with zero roots and zero top terms removed.
+
+    Leading zero cash flows only add roots at v = 0 (an infinite rate) and
+    trailing ones lower the degree, so neither contributes an IRR.
+    """
+    cf = np.asarray(cash_flows, dtype=float)
+    nonzero = np.flatnonzero(cf)
+    if nonzero.size < 2:
+        return cf[:0]
+    return cf[nonzero[0]:nonzero[-1] + 1]
+
+
+def _companion_roots(coefficients):
+    """Eigenvalues of the companion matrices of same-degree polynomials (one per row, constant term first)."""
+    count, size = coefficients.shape
+    degree = size - 1
+    companion = np.zeros((count, degree, degree))
+    companion[:, np.arange(1, degree), np.arange(degree - 1)] = 1.0
+    companion[:, :, -1] = -coefficients[:, :-1] / coefficients[:, -1:]
+    return np.linalg.eigvals(companion)
+
+
+def _polish_roots(cash_flows, eigenvalues, tol, max_iter=50):
+    """Turn eigenvalues v of one series into sorted, Newton-polished IRRs r = 1 / v - 1 > -1."""
+    real = eigenvalues[(np.abs(eigenvalues.imag) <= IMAG_TOL * np.maximum(1.0, np.abs(eigenvalues)))
+                       & (eigenvalues.real > 0)].real
+    if real.size == 0:
+        return []
+    poly = _NPVPolynomial(cash_flows)
+    abs_poly = _NPVPolynomial(np.abs(poly.cf))
+    roots = []
+    for r in 1.0 / real - 1.0:
+        for _ in range(max_iter):
+            f, df = poly.value_and_slope(r)
+            if df == 0 or not np.isfinite(f):
+                break
+            step = f / df
+            if r - step <= -1:
+                break
+            r -= step
+            if abs(step) <= tol * max(1.0, abs(r)):
+                break
+        # Eigenvalues of a nearly touching complex pair are not roots: check the residual
+        f = poly.evaluate(r)[0]
+        if abs(f) <= ROOT_RESIDUAL * abs_poly.evaluate(r)[0]:
+            roots.append(float(r))
+
+    # A double root comes back as two values a few 1e-8 apart: report their mean once
+    clusters = []
+    for root in sorted(roots):
+        if clusters and root - clusters[-1][-1] <= ROOT_MERGE_TOL * max(1.0, abs(root)):
+            clusters[-1].append(root)
+        else:
+            clusters.append([root])
+    return [sum(cluster) / len(cluster) for cluster in clusters]
+
+
+def irr_roots(cash_flows, tol=1e-10):
+    """Return every real IRR (any rate above -100%) of ``cash_flows``, sorted.
+
+    Solves the NPV polynomial in v = 1 / (1 + r) exactly through the
+    eigenvalues of its companion matrix, keeps the real v > 0 and polishes
+    each rate with Newton iterations. Unlike :func:`find_irrs` there is no
+    search range, so negative IRRs and IRRs above 100% are found too; the
+    cost is an O(n ** 3) eigenproblem for n periods.
+    """
+    return irr_roots_batch(np.atleast_2d(np.asarray(cash_flows, dtype=float)), tol=tol)[0]
+
+
+def irr_roots_batch(cash_flows, lengths=None, tol=1e-10):
+    """Return :func:`irr_roots` for every row of a zero-padded 2D cash-flow array.
+
+    Rows whose polynomials have the same degree are solved together with one
+    stacked ``np.linalg.eigvals`` call, in blocks bounded by the size of the
+    companion matrices. Rows holding a NaN or infinite cash flow have no IRRs.
+    """
+    cf = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    if lengths is None:
+        lengths = np.full(cf.shape[0], cf.shape[1])
+    series = [cf[i, :lengths[i]] for i in range(cf.shape[0])]
+    trimmed = [_trim_polynomial(row) for row in series]
+
+    by_degree = {}
+    for i, coefficients in enumerate(trimmed):
+        if coefficients.size and np.isfinite(coefficients).all():
+            by_degree.setdefault(coefficients.size, []).append(i)
+
+    results = [[] for _ in series]
+    for size, rows in by_degree.items():
+        block_rows = max(1, BLOCK_ELEMENTS // (size * size))
+        for start in range(0, len(rows), block_rows):
+            block = rows[start:start + block_rows]
+            eigenvalues = _companion_roots(np.stack([trimmed[i] for i in block]))
+            for i, values in zip(block, eigenvalues):
+                results[i] = _polish_roots(series[i], values, tol)
+    return results
+
+
+def find_multiple_irrs(cash_flows, rate_min=0.0001, rate_max=0.9999, precision=1e-10):
+    """Find multiple IRRs if they exist by identifying zero-crossings in the NPV function.
+
+    Returns the sorted list of IRRs in [rate_min, rate_max] and the number of
+    sign changes in the cash flows.
+    """
+    return find_irrs(cash_flows, rate_min, rate_max, tol=precision), count_sign_changes(cash_flows)
+
+
+def irr_summary_batch(cash_flows, lengths=None, rate_min=0.0001, rate_max=0.9999, tol=1e-10):
+    """Return the IRRs :func:`irr_summary` reports for every row of a zero-padded 2D cash-flow array.
+
+    The IRRs in [rate_min, rate_max] of all rows come from
+    :func:`find_irrs_batch`; rows of up to ``ALL_ROOTS_MAX_PERIODS`` periods
+    are completed with their IRRs outside that range from
+    :func:`irr_roots_batch`. Rows holding a NaN or infinite cash flow have
+    no IRRs.
+    """
+    cf = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    if lengths is None:
+        lengths = np.full(cf.shape[0], cf.shape[1])
+    lengths = np.asarray(lengths)
+    finite = np.isfinite(cf).all(axis=1)
+    irrs = find_irrs_batch(cf, lengths, rate_min, rate_max, tol)
+    short = np.flatnonzero(finite & (lengths <= ALL_ROOTS_MAX_PERIODS))
+    for i, all_roots in zip(short, irr_roots_batch(cf[short], lengths[short], tol)):
+        # Add the roots not already in the list (within a tolerance)
+        irrs[i].extend(root for root in all_roots if all(abs(root - irr) > ROOT_MERGE_TOL for irr in irrs[i]))
+        irrs[i].sort()
+    for i in np.flatnonzero(~finite):
+        irrs[i] = []
+    return irrs
+
+
+def irr_summary(cash_flows):
+    """Return (irrs, sign_changes, multiple_irrs) as reported by the app.
+
+    IRRs from :func:`find_multiple_irrs` are completed with the IRRs outside
+    its range from :func:`irr_roots` (for series of up to
+    ``ALL_ROOTS_MAX_PERIODS`` periods, beyond which the eigenproblem is too
+    slow for an interactive page). Cash flows that are not all finite have
+    no IRRs. The batch mode uses the same :func:`irr_summary_batch`.
+    """
+    cf = np.asarray(cash_flows, dtype=float)
+    irrs = irr_summary_batch(cf[None, :])[0]
+    return irrs, count_sign_changes(cf), len(irrs) > 1
@@ -0,0 +1,188 @@
+"""Monte Carlo simulation of NPV and IRR under uncertain cash flows.
+
+Scenarios are drawn in chunks, each chunk evaluated with the vectorized
+NPV kernel and the batched IRR solver, and folded into running aggregates
+(moments, a self-resizing NPV histogram for quantiles, a fixed IRR
+histogram), so memory stays constant however many scenarios are drawn.
+
+Every chunk gets its own child seed spawned from one ``SeedSequence``, so
+results depend only on ``seed`` and ``chunk_size``, not on the number of
+worker processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .irr import SCAN_POINTS, find_irrs_batch
+from .npv import npv_matrix
+
+# Scenarios evaluated per chunk
+CHUNK_SIZE = 10_000
+
+# Resolution of the NPV histogram used for quantiles
+NPV_BINS = 8192
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def normal_scenarios(rng, base_cash_flows, volatility, size):
+    """Scenarios with every cash flow after period 0 scaled by (1 + volatility * N(0, 1))."""
+    base = np.asarray(base_cash_flows, dtype=float)
+    shocks = np.ones((size, base.size))
+    shocks[:, 1:] += volatility * rng.standard_normal((size, base.size - 1))
+    return base * shocks
+
+
+class StreamingHistogram:
+    """Fixed number of equal-width bins whose range doubles to cover new values.
+
+    Growing the range merges neighbouring bins pairwise, so the memory used
+    never changes and counts are never lost; quantiles are accurate to one
+    bin width.
+    """
+
+    def __init__(self, bins=NPV_BINS):
+        if bins % 2:
+            raise ValueError("bins must be even")
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.low = None
+        self.width = None
+
+    @property
+    def high(self):
+        return self.low + self.width * self.counts.size
+
+    def _grow(self, to_the_right):
+        merged = self.counts.reshape(-1, 2).sum(axis=1)
+        half = merged.size
+        self.counts = np.zeros_like(self.counts)
+        if to_the_right:
+            self.counts[:half] = merged
+        else:
+            self.counts[half:] = merged
+            self.low -= self.width * self.counts.size
+        self.width *= 2
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        lo, hi = values.min(), values.max()
+        if self.low is None:
+            span = hi - lo
+            self.width = span / self.counts.size if span > 0 else max(abs(lo), 1.0) * 1e-6
+            self.low = lo
+        while hi >= self.high:
+            self._grow(to_the_right=True)
+        while lo < self.low:
+            self._grow(to_the_right=False)
+        index = np.minimum(((values - self.low) / self.width).astype(np.int64), self.counts.size - 1)
+        self.counts += np.bincount(index, minlength=self.counts.size)
+
+    def quantiles(self, qs):
+        """Interpolated quantiles for the probabilities in ``qs``."""
+        total = self.counts.sum()
+        if total == 0:
+            return [np.nan] * len(qs)
+        cumulative = np.concatenate(([0], np.cumsum(self.counts)))
+        edges = self.low + self.width * np.arange(self.counts.size + 1)
+        return np.interp(np.asarray(qs) * total, cumulative, edges).tolist()
+
+
+class SimulationAccumulator:
+    """Running NPV/IRR statistics over chunks of scenarios."""
+
+    def __init__(self, irr_range=(0.0001, 0.9999), irr_bins=100, npv_bins=NPV_BINS):
+        self.count = 0
+        self.npv_mean = 0.0
+        self.npv_m2 = 0.0
+        self.npv_min = np.inf
+        self.npv_max = -np.inf
+        self.negative = 0
+        self.npv_histogram = StreamingHistogram(npv_bins)
+        self.irr_edges = np.linspace(*irr_range, irr_bins + 1)
+        self.irr_counts = np.zeros(irr_bins, dtype=np.int64)
+        # Scenarios by number of IRRs found: 0, 1, 2 or more
+        self.roots = np.zeros(3, dtype=np.int64)
+
+    def add(self, npvs, irrs, root_counts):
+        """Fold in one chunk: its NPVs, all IRRs found, and the number of IRRs per scenario."""
+        # Combine the chunk's mean and sum of squared deviations with the running ones (Chan et al.)
+        n = npvs.size
+        chunk_mean = float(np.mean(npvs))
+        delta = chunk_mean - self.npv_mean
+        total = self.count + n
+        self.npv_m2 += float(np.sum((npvs - chunk_mean) ** 2)) + delta * delta * self.count * n / total
+        self.npv_mean += delta * n / total
+        self.count = total
+        self.npv_min = min(self.npv_min, float(npvs.min()))
+        self.npv_max = max(self.npv_max, float(npvs.max()))
+        self.negative += int(np.count_nonzero(npvs < 0))
+        self.npv_histogram.add(npvs)
+        self.irr_counts += np.histogram(irrs, bins=self.irr_edges)[0]
+        self.roots += np.bincount(np.minimum(root_counts, 2), minlength=3)
+
+    def summary(self, quantiles=QUANTILES):
+        """Return the aggregated statistics as a dict."""
+        return {
+            "scenarios": self.count,
+            "npv_mean": self.npv_mean if self.count else np.nan,
+            "npv_std": float(np.sqrt(self.npv_m2 / self.count)) if self.count else np.nan,
+            "npv_min": self.npv_min,
+            "npv_max": self.npv_max,
+            "prob_npv_negative": self.negative / self.count if self.count else np.nan,
+            "npv_quantiles": dict(zip(quantiles, self.npv_histogram.quantiles(quantiles))),
+            "irr_bin_edges": self.irr_edges.tolist(),
+            "irr_histogram": self.irr_counts.tolist(),
+            "scenarios_without_irr": int(self.roots[0]),
+            "scenarios_with_one_irr": int(self.roots[1]),
+            "scenarios_with_multiple_irrs": int(self.roots[2]),
+        }
+
+
+def simulate_chunk(seed, size, base_cash_flows, volatility, rate, irr_range, scan_points,
+                   generator=normal_scenarios):
+    """Draw and evaluate one chunk. Returns (npvs, all IRRs, IRR count per scenario)."""
+    rng = np.random.default_rng(seed)
+    scenarios = generator(rng, base_cash_flows, volatility, size)
+    npvs = npv_matrix(scenarios, rate)[:, 0]
+    irr_lists = find_irrs_batch(scenarios, None, *irr_range, scan_points=scan_points)
+    root_counts = np.array([len(irrs) for irrs in irr_lists], dtype=np.int64)
+    irrs = np.fromiter((irr for irrs in irr_lists for irr in irrs), dtype=float)
+    return npvs, irrs, root_counts
+
+
+def simulate(base_cash_flows, volatility=0.10, scenarios=1_000_000, rate=0.10, seed=0,
+             chunk_size=CHUNK_SIZE, workers=1, irr_range=(0.0001, 0.9999), irr_bins=100,
+             scan_points=SCAN_POINTS, generator=normal_scenarios):
+    """Simulate NPV at ``rate`` and all IRRs in ``irr_range`` for ``scenarios`` draws.
+
+    ``generator(rng, base_cash_flows, volatility, size)`` draws one chunk of
+    scenarios (one per row); it must be a module-level function when
+    ``workers`` > 1 (``None`` uses every CPU). Returns
+    :meth:`SimulationAccumulator.summary`.
+    """
+    sizes = [min(chunk_size, scenarios - start) for start in range(0, scenarios, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (base_cash_flows, volatility, rate, irr_range, scan_points, generator)
+    accumulator = SimulationAccumulator(irr_range, irr_bins)
+
+    if workers == 1:
+        for chunk_seed, size in zip(seeds, sizes):
+            accumulator.add(*simulate_chunk(chunk_seed, size, *args))
+        return accumulator.summary()
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep only a few chunks in flight so finished results never pile up
+        max_in_flight = 2 * workers
+        pending = []
+        for chunk_seed, size in zip(seeds, sizes):
+            pending.append(pool.submit(simulate_chunk, chunk_seed, size, *args))
+            if len(pending) >= max_in_flight:
+                accumulator.add(*pending.pop(0).result())
+        for future in pending:
+            accumulator.add(*future.result())
+    return accumulator.summary()
@@ -0,0 +1,61 @@
+"""Vectorized NPV evaluation over whole rate grids."""
+import numpy as np
+
+# Largest rates x periods block of discount factors built at once (~8 MB)
+BLOCK_ELEMENTS = 1 << 20
+
+
+def discount_factors(rates, periods):
+    """Return the matrix of 1 / (1 + r) ** t for every rate (rows) and period (columns).
+
+    Computed as exp(-t * log(1 + r)), which is much faster than ``np.power``
+    once the factors of long series underflow. Rates must be above -100%.
+    """
+    log_growth = np.log1p(np.atleast_1d(np.asarray(rates, dtype=float)))
+    return np.exp(-np.multiply.outer(log_growth, np.asarray(periods, dtype=float)))
+
+
+def npv_matrix(cash_flows, rates):
+    """Evaluate the NPV of several cash-flow series at every rate in ``rates``.
+
+    ``cash_flows`` is a 2D array with one series per row (shorter series
+    padded with zeros). Returns an array of shape (series, rates).
+
+    The discount-factor matrix is built in blocks of periods so that long
+    series (monthly models with thousands of periods) stay within a fixed
+    memory budget while each block is still a single matrix product.
+    """
+    cf = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    r = np.atleast_1d(np.asarray(rates, dtype=float))
+    npvs = np.zeros((cf.shape[0], r.size), dtype=float)
+    if cf.size == 0 or r.size == 0:
+        return npvs
+
+    n_periods = cf.shape[1]
+    step = max(1, BLOCK_ELEMENTS // r.size)
+    for start in range(0, n_periods, step):
+        stop = min(start + step, n_periods)
+        npvs += cf[:, start:stop] @ discount_factors(r, np.arange(start, stop)).T
+    return npvs
+
+
+def pad_cash_flows(series):
+    """Stack ragged series into a zero-padded 2D array. Returns (matrix, lengths).
+
+    Trailing zero cash flows leave both the NPV and the IRRs unchanged.
+    """
+    lengths = np.array([len(s) for s in series], dtype=int)
+    matrix = np.zeros((len(series), lengths.max(initial=0)))
+    for i, s in enumerate(series):
+        matrix[i, :lengths[i]] = s
+    return matrix, lengths
+
+
+def npv_curve(cash_flows, rates):
+    """Evaluate the NPV of one cash-flow series at every rate in ``rates``."""
+    return npv_matrix(np.asarray(cash_flows, dtype=float).reshape(1, -1), rates)[0]
+
+
+def compute_npv(cash_flows, r):
+    """NPV of one cash-flow series at a single rate ``r``."""
+    return float(npv_curve(cash_flows, r)[0])
@@ -0,0 +1,106 @@
+"""Process-pool sharding of the batch IRR computation.
+
+The padded cash-flow matrix and the series lengths are placed in shared
+memory once; workers attach to them by name and only row ranges travel
+through the pool, so no cash-flow lists are pickled. Results come back in
+input order, one chunk at a time, with only a few chunks in flight.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .irr import find_irrs_batch
+
+# Smallest task (in rows) when the caller does not choose one; small enough to balance
+# uneven projects across workers, large enough to keep the scan vectorized
+MIN_CHUNK_ROWS = 256
+
+# Arrays attached by each worker process: name -> (SharedMemory, ndarray)
+_worker_arrays = {}
+
+
+def _share(array):
+    """Copy ``array`` into a new shared memory block. Returns (block, spec)."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    if name not in _worker_arrays:
+        block = shared_memory.SharedMemory(name=name)
+        _worker_arrays[name] = (block, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+    return _worker_arrays[name][1]
+
+
+def _solve_rows(solver, cash_flows_spec, lengths_spec, start, stop, rate_min, rate_max, tol):
+    cash_flows = _attach(cash_flows_spec)
+    lengths = _attach(lengths_spec)
+    return solver(cash_flows[start:stop], lengths[start:stop], rate_min, rate_max, tol)
+
+
+def default_workers():
+    """Number of worker processes used when none is requested."""
+    return os.cpu_count() or 1
+
+
+def iter_irrs_parallel(cash_flows, lengths=None, rate_min=0.0001, rate_max=0.9999, tol=1e-10,
+                       workers=None, chunk_rows=None, solver=find_irrs_batch):
+    """Yield the IRRs of consecutive blocks of ``chunk_rows`` rows, solved on a process pool.
+
+    Each block is a list like :func:`npv_irr.irr.find_irrs_batch` returns,
+    yielded in input order as soon as it is solved. At most two blocks per
+    worker are in flight, so results never pile up ahead of the consumer.
+    ``workers`` defaults to the number of CPUs; with one worker (or one
+    chunk) the blocks are solved in this process. ``solver`` (a module-level
+    function with the signature of ``find_irrs_batch``, such as
+    :func:`npv_irr.irr.irr_summary_batch`) solves each block.
+    """
+    cash_flows = np.ascontiguousarray(np.atleast_2d(cash_flows), dtype=float)
+    n_rows = cash_flows.shape[0]
+    if lengths is None:
+        lengths = np.full(n_rows, cash_flows.shape[1])
+    lengths = np.ascontiguousarray(lengths, dtype=np.int64)
+
+    workers = workers or default_workers()
+    if chunk_rows is None:
+        chunk_rows = max(MIN_CHUNK_ROWS, -(-n_rows // (4 * workers)))
+    bounds = [(start, min(start + chunk_rows, n_rows)) for start in range(0, n_rows, chunk_rows)]
+    if workers == 1 or len(bounds) <= 1:
+        for start, stop in bounds:
+            yield solver(cash_flows[start:stop], lengths[start:stop], rate_min, rate_max, tol)
+        return
+
+    cf_block, cf_spec = _share(cash_flows)
+    len_block, len_spec = _share(lengths)
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as pool:
+            max_in_flight = 2 * workers
+            pending = []
+            for start, stop in bounds:
+                pending.append(pool.submit(_solve_rows, solver, cf_spec, len_spec, start, stop, rate_min, rate_max, tol))
+                if len(pending) >= max_in_flight:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+    finally:
+        for block in (cf_block, len_block):
+            block.close()
+            block.unlink()
+
+
+def find_irrs_parallel(cash_flows, lengths=None, rate_min=0.0001, rate_max=0.9999, tol=1e-10,
+                       workers=None, chunk_rows=None):
+    """Return the IRRs of every row of a padded cash-flow matrix using a process pool.
+
+    Same results as :func:`npv_irr.irr.find_irrs_batch`, in input order.
+    ``workers`` defaults to the number of CPUs; with one worker (or one
+    chunk) the rows are solved in this process.
+    """
+    irrs = []
+    for block in iter_irrs_parallel(cash_flows, lengths, rate_min, rate_max, tol, workers, chunk_rows):
+        irrs.extend(block)
+    return irrs
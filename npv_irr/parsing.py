@@ -0,0 +1,191 @@
+"""Streaming parser for pasted or uploaded cash-flow series.
+
+Values may be separated by commas, line breaks or both (one value per line
+as exported from a spreadsheet column). They are read straight into a
+float64 array without building an intermediate list of strings, and every
+bad token is reported with its position instead of failing on the first.
+"""
+import codecs
+import math
+import re
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+# Problems listed in a ParseError; further ones are only counted
+MAX_REPORTED_ERRORS = 10
+
+# Characters read from an uploaded file at a time
+CHUNK_SIZE = 1 << 16
+
+_SEPARATOR = re.compile(r",|\n")
+# A comma ending a line, which joins the line break as one separator
+_LINE_END_COMMA = re.compile(r",[^\S\n]*\n")
+# An empty or whitespace-only field between two commas
+_BLANK_FIELD = re.compile(r",\s*,")
+
+ParseIssue = namedtuple("ParseIssue", ["period", "line", "column", "token", "reason"])
+
+
+class ParseError(ValueError):
+    """Raised when the input holds tokens that are not numbers (or no numbers at all)."""
+
+    def __init__(self, issues, total):
+        self.issues = issues
+        self.total = total
+        if issues:
+            listed = "; ".join(
+                f"line {issue.line}, column {issue.column}: {issue.reason} {issue.token!r}"
+                for issue in issues
+            )
+            more = f" (and {total - len(issues)} more)" if total > len(issues) else ""
+            message = f"{total} invalid value(s): {listed}{more}"
+        else:
+            message = "No cash flows entered"
+        super().__init__(message)
+
+
+def _iter_fields(chunks):
+    """Yield (offset, line, column, field, separator before, separator after) for every field.
+
+    Separators are "," or "\\n"; "" stands for the start or end of the input.
+    Fields may span chunk boundaries.
+    """
+    pending, pending_offset = "", 0
+    before, line, line_start = "", 1, 0
+    for chunk in chunks:
+        buffer = pending + chunk
+        position = 0
+        for match in _SEPARATOR.finditer(buffer):
+            offset = pending_offset + position
+            yield offset, line, offset - line_start + 1, buffer[position:match.start()], before, match.group()
+            before, position = match.group(), match.end()
+            if before == "\n":
+                line, line_start = line + 1, pending_offset + position
+        pending, pending_offset = buffer[position:], pending_offset + position
+    yield pending_offset, line, pending_offset - line_start + 1, pending, before, ""
+
+
+def _iter_text_chunks(fileobj, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    """Decode a binary (or text) file object chunk by chunk."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+    yield decoder.decode(b"", final=True)
+
+
+def _parse_bulk(text):
+    """Parse well-formed text in one NumPy call; return None if it needs the careful path."""
+    text = _LINE_END_COMMA.sub("\n", text).strip().replace("\n", ",")
+    # NumPy reads a whitespace-only field as -1 instead of failing
+    if not text or text[0] == "," or text[-1] == "," or _BLANK_FIELD.search(text):
+        return None
+    with warnings.catch_warnings():
+        # NumPy signals unparsable text with a DeprecationWarning and a truncated result
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            cash_flows = np.fromstring(text, dtype=np.float64, sep=",")
+        except (DeprecationWarning, ValueError):
+            return None
+    # A trailing comma is skipped silently by NumPy, and nan/inf (or an overflow) are
+    # accepted; leave both to the careful path, which reports them
+    if cash_flows.size != text.count(",") + 1 or not np.isfinite(cash_flows).all():
+        return None
+    return cash_flows
+
+
+def _parse_token(token):
+    """Return (value, None) for a finite number, or (None, reason) saying why ``token`` is not a cash flow."""
+    if not token:
+        return None, "empty value"
+    try:
+        value = float(token)
+    except ValueError:
+        return None, "not a number"
+    if not math.isfinite(value):
+        return None, "not a finite number"
+    return value, None
+
+
+def parse_cash_flows(source, max_errors=MAX_REPORTED_ERRORS):
+    """Parse cash flows from a string or a file object into a float64 array.
+
+    Blank lines are ignored, and a comma and a line break with only
+    whitespace between them count as one separator (``300,\\n400``). Any
+    other empty value next to a comma is an error, as are nan, inf and
+    values too large for a float.
+    Raises :class:`ParseError` listing up to ``max_errors`` offending tokens
+    with their period, line and column.
+    """
+    if isinstance(source, str):
+        cash_flows = _parse_bulk(source)
+        if cash_flows is not None:
+            return cash_flows
+    chunks = [source] if isinstance(source, str) else _iter_text_chunks(source)
+    issues = []
+    total = 0
+
+    def values():
+        nonlocal total
+        period = 0
+        # Commas since the last value: line breaks may join one of them, not two
+        commas = 0
+        for _, line, column, field, before, after in _iter_fields(chunks):
+            token = field.strip()
+            commas += before == ","
+            if not token:
+                if "," not in (before, after):
+                    continue
+                if {before, after} == {",", "\n"} and commas + (after == ",") <= 1:
+                    continue
+            else:
+                commas = 0
+            value, reason = _parse_token(token)
+            if reason:
+                total += 1
+                if len(issues) < max_errors:
+                    column += len(field) - len(field.lstrip())
+                    issues.append(ParseIssue(period, line, column, token, reason))
+            else:
+                yield value
+            period += 1
+
+    cash_flows = np.fromiter(values(), dtype=np.float64)
+    if total or cash_flows.size == 0:
+        raise ParseError(issues, total)
+    return cash_flows
+
+
+def parse_projects(text, max_errors=MAX_REPORTED_ERRORS):
+    """Parse one project per line, ``name: cash flows`` or just the cash flows.
+
+    Returns (names, list of float64 arrays); unnamed projects are called
+    "Project 1", "Project 2", ... Raises :class:`ParseError` with the issues
+    of every line, located in ``text``.
+    """
+    names, series, issues = [], [], []
+    total = 0
+    for line, content in enumerate(text.splitlines(), start=1):
+        if not content.strip():
+            continue
+        name, separator, values = content.partition(":")
+        offset = len(name) + 1
+        if not separator:
+            name, values, offset = f"Project {len(names) + 1}", content, 0
+        try:
+            cash_flows = parse_cash_flows(values, max_errors)
+        except ParseError as error:
+            if error.total == 0:
+                error.issues, error.total = [ParseIssue(0, 1, len(values) + 1, "", "no cash flows")], 1
+            total += error.total
+            issues.extend(issue._replace(line=line, column=issue.column + offset) for issue in error.issues)
+            continue
+        names.append(name.strip() or f"Project {len(names) + 1}")
+        series.append(cash_flows)
+    if total or not series:
+        raise ParseError(issues[:max_errors], total)
+    return names, series
@@ -0,0 +1,264 @@
+"""Plotly figures for the NPV curve, its IRRs and the sensitivity tornado (imports Plotly on first use of this module)."""
+import numpy as np
+import plotly.graph_objects as go
+
+from .npv import compute_npv
+
+# Colors for multiple IRRs if needed
+IRR_COLORS = ['red', 'purple', 'orange', 'green']
+
+
+def compact_array(values, tolerance):
+    """``values`` as float32 if that moves no value by more than ``tolerance``, else float64.
+
+    Plotly sends NumPy arrays to the browser base64-encoded with their
+    dtype, so float32 halves the payload of a trace.
+    """
+    values = np.asarray(values, dtype=float)
+    narrow = values.astype(np.float32)
+    if np.all(np.abs(narrow - values) <= tolerance):
+        return narrow
+    return values
+
+
+class NPVFigure:
+    """The "NPV vs. Discount Rate" chart, kept across reruns and patched in place.
+
+    The layout is built once; :meth:`update` only touches the curve when its
+    points changed and rebuilds the IRR markers, lines and annotations only
+    when the IRRs or the rate range changed.
+    """
+
+    def __init__(self):
+        self.figure = go.Figure(layout=_npv_layout())
+        self.figure.add_trace(go.Scatter(
+            mode='lines',
+            name='NPV Curve',
+            line=dict(color='#3b82f6', width=3),
+            hovertemplate='Rate: %{x:.2f}%<br>NPV: €%{y:.2f}<extra></extra>'
+        ))
+        self._curve = None
+        self._markers = None
+
+    def update(self, cash_flows, rates, npv_values, irrs, min_rate, max_rate):
+        """Bring the chart up to date and return the ``go.Figure``.
+
+        ``rates`` and ``irrs`` are decimals; ``min_rate``/``max_rate`` bound
+        the chart in percent. IRRs outside that range are not marked.
+        """
+        rates = np.asarray(rates, dtype=float)
+        npv_values = np.asarray(npv_values, dtype=float)
+        curve = self._curve
+        curve_changed = (curve is None or not np.array_equal(curve[0], rates)
+                         or not np.array_equal(curve[1], npv_values))
+        # The IRR lines run down to the curve's minimum, so they depend on it too
+        markers = (tuple(irrs), min_rate, max_rate, float(min(npv_values.min(), 0)))
+
+        with self.figure.batch_update():
+            if curve_changed:
+                # Hover shows rates and NPVs to two decimals, so float32 is exact enough when it keeps them
+                self.figure.data[0].x = compact_array(rates * 100, 5e-5)
+                self.figure.data[0].y = compact_array(npv_values, 5e-3)
+                self._curve = (rates, npv_values)
+            if markers != self._markers:
+                self._mark_irrs(cash_flows, irrs, min_rate, max_rate, markers[3])
+                self._markers = markers
+        return self.figure
+
+    def _mark_irrs(self, cash_flows, irrs, min_rate, max_rate, line_bottom):
+        fig = self.figure
+        fig.data = fig.data[:1]
+
+        # Add zero line
+        shapes = [go.layout.Shape(
+            type="line",
+            x0=min_rate,
+            y0=0,
+            x1=max_rate,
+            y1=0,
+            line=dict(
+                color="black",
+                width=1,
+                dash="dash",
+            )
+        )]
+        annotations = []
+
+        # If IRRs are computed and lie within the selected discount rate range, mark them
+        for idx, irr in enumerate(irrs):
+            irr_percent = irr * 100
+            if not min_rate <= irr_percent <= max_rate:
+                continue
+            color = IRR_COLORS[idx % len(IRR_COLORS)]
+            npv_at_irr = compute_npv(cash_flows, irr)
+
+            # Add IRR point
+            fig.add_trace(go.Scatter(
+                x=[irr_percent],
+                y=[npv_at_irr],
+                mode='markers',
+                marker=dict(size=12, color=color, symbol='circle'),
+                name=f'IRR {idx+1} = {irr_percent:.2f}%',
+                hovertemplate='IRR {}: %{{x:.2f}}%<br>NPV: €%{{y:.2f}}<extra></extra>'.format(idx+1)
+            ))
+
+            # Add IRR vertical line
+            shapes.append(go.layout.Shape(
+                type="line",
+                x0=irr_percent,
+                y0=line_bottom,
+                x1=irr_percent,
+                y1=0,
+                line=dict(
+                    color=color,
+                    width=1,
+                    dash="dash",
+                )
+            ))
+
+            # Add IRR annotation
+            annotations.append(go.layout.Annotation(
+                x=irr_percent,
+                y=0,
+                text=f"IRR {idx+1}: {irr_percent:.2f}%",
+                showarrow=True,
+                arrowhead=2,
+                arrowsize=1,
+                arrowwidth=2,
+                arrowcolor=color,
+                ax=0,
+                ay=-40 - (idx * 30),  # Stagger annotations
+                bordercolor=color,
+                borderwidth=2,
+                borderpad=8,
+                bgcolor="white",
+                opacity=0.8,
+                font=dict(color=color, size=16)  # Increased font size
+            ))
+
+        fig.layout.shapes = shapes
+        fig.layout.annotations = annotations
+
+
+def _npv_layout():
+    return go.Layout(
+        title=dict(
+            text="NPV vs. Discount Rate",
+            font=dict(size=24)
+        ),
+        xaxis=dict(
+            title=dict(text="Discount Rate (%)", font=dict(size=18)),
+            tickfont=dict(size=14),
+            tickformat='.1f'
+        ),
+        yaxis=dict(
+            title=dict(text="Net Present Value (€)", font=dict(size=18)),
+            tickfont=dict(size=14),
+            tickformat=',.2f'
+        ),
+        legend=dict(
+            orientation="h", 
+            y=-0.2, 
+            x=0.5,
+            font=dict(size=16)
+        ),
+        height=600,
+        margin=dict(l=80, r=80, t=80, b=120)
+    )
+
+
+def build_npv_figure(cash_flows, rates, npv_values, irrs, min_rate, max_rate):
+    """Build the "NPV vs. Discount Rate" chart as a new figure (see :class:`NPVFigure`)."""
+    return NPVFigure().update(cash_flows, rates, npv_values, irrs, min_rate, max_rate)
+
+
+def build_tornado_figure(base_npv, rows, max_bars=15):
+    """Build a tornado chart from :func:`npv_irr.sensitivity.tornado` rows (largest swings on top)."""
+    rows = rows[:max_bars][::-1]
+    labels = [label for label, _, _ in rows]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=labels,
+        x=[low - base_npv for _, low, _ in rows],
+        base=base_npv,
+        orientation='h',
+        name='Input decreased',
+        marker=dict(color='#DC2626'),
+        hovertemplate='%{y}: NPV €%{x:,.2f}<extra></extra>'
+    ))
+    fig.add_trace(go.Bar(
+        y=labels,
+        x=[high - base_npv for _, _, high in rows],
+        base=base_npv,
+        orientation='h',
+        name='Input increased',
+        marker=dict(color='#16A34A'),
+        hovertemplate='%{y}: NPV €%{x:,.2f}<extra></extra>'
+    ))
+    fig.update_layout(
+        barmode='overlay',
+        title=dict(text="NPV Sensitivity (Tornado)", font=dict(size=20)),
+        xaxis=dict(title=dict(text="Net Present Value (€)"), tickformat=',.2f'),
+        legend=dict(orientation="h", y=-0.2, x=0.5),
+        height=max(300, 40 * len(rows) + 150),
+        margin=dict(l=80, r=80, t=60, b=80)
+    )
+    return fig
+
+
+def build_comparison_figure(names, rates, npvs, crossovers, min_rate, max_rate):
+    """Overlay the NPV profiles of several projects and mark their crossover (Fisher) rates.
+
+    ``npvs`` has one row per project on the shared decimal grid ``rates``;
+    ``crossovers`` are :func:`npv_irr.compare.crossover_rates` rows;
+    ``min_rate``/``max_rate`` bound the chart in percent.
+    """
+    fig = go.Figure()
+    x = compact_array(np.asarray(rates) * 100, 5e-5)
+    for name, values in zip(names, npvs):
+        fig.add_trace(go.Scatter(
+            x=x,
+            y=compact_array(values, 5e-3),
+            mode='lines',
+            name=name,
+            line=dict(width=2),
+            hovertemplate=f'{name}<br>Rate: %{{x:.2f}}%<br>NPV: €%{{y:.2f}}<extra></extra>'
+        ))
+
+    if crossovers:
+        fig.add_trace(go.Scatter(
+            x=[rate * 100 for _, _, rate, _ in crossovers],
+            y=[npv for _, _, _, npv in crossovers],
+            mode='markers',
+            marker=dict(size=10, color='black', symbol='x'),
+            name='Crossover rates',
+            text=[f"{names[i]} = {names[j]}" for i, j, _, _ in crossovers],
+            hovertemplate='%{text}<br>Fisher rate: %{x:.2f}%<br>NPV: €%{y:.2f}<extra></extra>'
+        ))
+
+    # Add zero line
+    fig.add_shape(
+        type="line",
+        x0=min_rate,
+        y0=0,
+        x1=max_rate,
+        y1=0,
+        line=dict(color="black", width=1, dash="dash")
+    )
+    fig.update_layout(
+        title=dict(text="NPV Profiles and Crossover Rates", font=dict(size=24)),
+        xaxis=dict(
+            title=dict(text="Discount Rate (%)", font=dict(size=18)),
+            tickfont=dict(size=14),
+            tickformat='.1f'
+        ),
+        yaxis=dict(
+            title=dict(text="Net Present Value (€)", font=dict(size=18)),
+            tickfont=dict(size=14),
+            tickformat=',.2f'
+        ),
+        legend=dict(orientation="h", y=-0.2, x=0.5, font=dict(size=14)),
+        height=600,
+        margin=dict(l=80, r=80, t=80, b=120)
+    )
+    return fig
@@ -0,0 +1,87 @@
+"""Per-stage timing and call counts for one run of the app (or any caller).
+
+Code marks its stages with ``with stage("name"):``. While no
+:class:`Profiler` is active this is a context-variable lookup returning a
+shared no-op context manager, so instrumented code costs next to nothing
+when profiling is off. Stages nest: a stage entered inside another is
+recorded as ``"outer/inner"``.
+
+Profiling is turned on with the NPV_IRR_PROFILE environment variable (or by
+the caller, e.g. the app's sidebar toggle); each finished run is logged as
+one JSON line at INFO level on the ``npv_irr.profiling`` logger. Like any
+library logger it only has a NullHandler: the application decides where
+the records go and must enable INFO for them (the app does so when its
+profiling toggle is on).
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import time
+
+LOGGER = logging.getLogger(__name__)
+LOGGER.addHandler(logging.NullHandler())
+
+_ACTIVE = contextvars.ContextVar("npv_irr_profiler", default=None)
+_DISABLED = contextlib.nullcontext()
+
+
+def profiling_enabled():
+    """Whether NPV_IRR_PROFILE asks for profiling ("1", "true", "yes" or "on")."""
+    return os.environ.get("NPV_IRR_PROFILE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def set_profiler(profiler):
+    """Make ``profiler`` (or ``None`` to disable) receive the stages of the current context."""
+    _ACTIVE.set(profiler)
+
+
+def stage(name):
+    """Context manager timing ``name`` on the active profiler; a no-op when there is none."""
+    profiler = _ACTIVE.get()
+    if profiler is None:
+        return _DISABLED
+    return profiler.stage(name)
+
+
+class Profiler:
+    """Wall-clock time and call count per stage, from construction to :meth:`finish`."""
+
+    def __init__(self):
+        self.stages = {}
+        self._path = []
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self._path.append(name)
+        # Registered on entry so an outer stage is listed before the stages nested in it
+        record = self.stages.setdefault("/".join(self._path), [0, 0.0])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record[1] += time.perf_counter() - start
+            record[0] += 1
+            self._path.pop()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    def report(self):
+        """Return one dict per stage (in order of first use) with calls, total and mean milliseconds."""
+        return [
+            {"stage": key, "calls": calls, "total_ms": seconds * 1e3, "mean_ms": seconds * 1e3 / calls}
+            for key, (calls, seconds) in self.stages.items()
+        ]
+
+    def finish(self, logger=LOGGER, **context):
+        """Log the run as one structured record and return it.
+
+        ``context`` (e.g. the number of cash flows) is included in the record.
+        """
+        record = {"event": "npv_irr.profile", **context, "total_ms": self.elapsed * 1e3, "stages": self.report()}
+        logger.info(json.dumps(record))
+        return record
@@ -0,0 +1,74 @@
+"""Sensitivity (tornado) analysis of NPV and IRRs.
+
+NPV is linear in every cash flow, so all its partial derivatives come from
+the one vector of discount factors d_t = (1 + r) ** -t, and the derivative
+with respect to the rate is one more dot product. Each IRR r* solves
+NPV(r*) = 0, so by the implicit function theorem
+dr*/dCF_t = -d_t(r*) / NPV'(r*). Everything is linear in the number of
+periods, instead of one NPV recomputation per perturbation.
+"""
+import csv
+import io
+
+import numpy as np
+
+from .npv import discount_factors
+
+# Relative change applied to each cash flow, and absolute change of the rate, for the tornado
+CASH_FLOW_SHIFT = 0.10
+RATE_SHIFT = 0.01
+
+
+def npv_sensitivities(cash_flows, rate):
+    """Return (npv, dNPV/dCF_t for every t, dNPV/dr) at ``rate``."""
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    t = np.arange(cash_flows.size)
+    factors = discount_factors(rate, t)[0]
+    npv = float(factors @ cash_flows)
+    dnpv_drate = -float(factors @ (t * cash_flows)) / (1.0 + rate)
+    return npv, factors, dnpv_drate
+
+
+def irr_sensitivities(cash_flows, irr):
+    """Return dIRR/dCF_t for every t at the IRR ``irr`` (nan where NPV is flat at the root)."""
+    _, factors, slope = npv_sensitivities(cash_flows, irr)
+    if slope == 0:
+        return np.full(factors.size, np.nan)
+    return -factors / slope
+
+
+def tornado(cash_flows, rate=0.10, cash_flow_shift=CASH_FLOW_SHIFT, rate_shift=RATE_SHIFT):
+    """Return (base NPV, rows) with rows (label, NPV with input decreased, NPV with input increased).
+
+    Each cash flow is scaled by 1 -/+ ``cash_flow_shift`` (exact, since NPV
+    is linear in it) and the rate moved by -/+ ``rate_shift``. Rows are
+    sorted by swing, largest first.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    npv, factors, _ = npv_sensitivities(cash_flows, rate)
+    swing = cash_flow_shift * cash_flows * factors
+    labels = [f"CF{t}" for t in range(cash_flows.size)] + [f"Rate ±{rate_shift:.2%}"]
+    periods = np.arange(cash_flows.size)
+    low = np.append(npv - swing, discount_factors(rate - rate_shift, periods)[0] @ cash_flows)
+    high = np.append(npv + swing, discount_factors(rate + rate_shift, periods)[0] @ cash_flows)
+    order = np.argsort(-np.abs(high - low), kind="stable")
+    return npv, [(labels[i], float(low[i]), float(high[i])) for i in order]
+
+
+def sensitivity_csv(cash_flows, rate=0.10, irrs=(), cash_flow_shift=CASH_FLOW_SHIFT):
+    """Return a CSV export with one row per period: NPV partials (the discount factors) and IRR partials."""
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    npv, factors, dnpv_drate = npv_sensitivities(cash_flows, rate)
+    irr_partials = [irr_sensitivities(cash_flows, irr) for irr in irrs]
+    swing = cash_flow_shift * cash_flows * factors
+
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow([f"# NPV at {rate:.2%}", npv, "dNPV/dr", dnpv_drate])
+    writer.writerow(["period", "cash_flow", "dNPV/dCF",
+                     f"NPV at CF -{cash_flow_shift:.0%}", f"NPV at CF +{cash_flow_shift:.0%}"]
+                    + [f"dIRR{k + 1}/dCF (IRR {irr:.4%})" for k, irr in enumerate(irrs)])
+    for t in range(cash_flows.size):
+        writer.writerow([t, cash_flows[t], factors[t], npv - swing[t], npv + swing[t]]
+                        + [partials[t] for partials in irr_partials])
+    return out.getvalue()
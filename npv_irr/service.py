@@ -0,0 +1,367 @@
+"""Local HTTP/JSON service for NPV and IRR with request micro-batching.
+
+Concurrent requests arriving within a short window are merged into
+vectorized evaluations: NPV requests into one ``npv_matrix`` call per
+series length and rate grid, IRR requests into ``find_irrs_batch`` calls run
+on a process pool, so the event loop never does the numerical work.
+
+Endpoints (JSON bodies):
+
+    POST /npv    {"cash_flows": [...], "rates": [...]}          -> {"npv": [...]}
+                 (an NPV too large for a float is returned as null)
+    POST /irr    {"cash_flows": [...], "rate_min": ..., "rate_max": ...}
+                                                              -> {"irrs": [...], "sign_changes": n}
+    GET  /stats  latency percentiles, request and batch counts
+    GET  /health {"status": "ok"}
+
+Usage:
+
+    python -m npv_irr.service --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+from .irr import count_sign_changes, find_irrs_batch
+from .npv import npv_matrix, pad_cash_flows
+
+# Longest wait for more requests before a batch is evaluated, and its size limit
+BATCH_WINDOW = 0.002
+MAX_BATCH = 256
+
+# Latencies kept per endpoint for the percentiles reported by /stats
+LATENCY_WINDOW = 10_000
+
+# Largest request body accepted (bytes)
+MAX_BODY = 16 * 1024 * 1024
+
+# Path -> accepted method
+ROUTES = {"/npv": "POST", "/irr": "POST", "/stats": "GET", "/health": "GET"}
+
+
+class RequestError(ValueError):
+    """A request that cannot be served; reported to the client as 400."""
+
+
+class MicroBatcher:
+    """Collect items submitted concurrently and process them together.
+
+    ``process`` is a coroutine function taking a list of items and returning
+    the list of their results in the same order.
+    """
+
+    def __init__(self, process, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.process = process
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self._queue = asyncio.Queue()
+        self._task = None
+        self._pending = set()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in [self._task, *self._pending]:
+            if task:
+                task.cancel()
+        for task in [self._task, *self._pending]:
+            if task:
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batches += 1
+            self.items += len(batch)
+            # Keep collecting the next batch while this one is evaluated
+            task = asyncio.create_task(self._complete(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _complete(self, batch):
+        try:
+            results = await self.process([item for item, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _cash_flows(payload):
+    try:
+        cash_flows = np.asarray(payload["cash_flows"], dtype=float)
+    except KeyError:
+        raise RequestError("missing 'cash_flows'") from None
+    except (TypeError, ValueError):
+        raise RequestError("'cash_flows' must be a list of numbers") from None
+    if cash_flows.ndim != 1 or cash_flows.size == 0:
+        raise RequestError("'cash_flows' must be a non-empty list of numbers")
+    return cash_flows
+
+
+def _rates(payload):
+    try:
+        rates = np.asarray(payload.get("rates", [0.10]), dtype=float).reshape(-1)
+    except (TypeError, ValueError):
+        raise RequestError("'rates' must be a list of numbers") from None
+    if np.any(rates <= -1):
+        raise RequestError("rates must be above -1 (-100%)")
+    return rates
+
+
+def _evaluate_npvs(requests):
+    """NPVs for a batch of (cash_flows, rates), one matrix evaluation per length and rate grid.
+
+    Only requests with the same number of periods and the same rates share
+    a matrix, so no request pays for another's padding or rates.
+    """
+    groups = defaultdict(list)
+    for index, (cash_flows, rates) in enumerate(requests):
+        groups[cash_flows.size, rates.tobytes()].append(index)
+    results = [None] * len(requests)
+    for indices in groups.values():
+        rates = requests[indices[0]][1]
+        npvs = npv_matrix(np.stack([requests[i][0] for i in indices]), rates)
+        for index, values in zip(indices, npvs.tolist()):
+            results[index] = [value if math.isfinite(value) else None for value in values]
+    return results
+
+
+def _solve_irrs(series, rate_min, rate_max):
+    """IRRs of a batch of series sharing one search range (runs in a worker process)."""
+    matrix, lengths = pad_cash_flows(series)
+    return find_irrs_batch(matrix, lengths, rate_min, rate_max)
+
+
+class NPVService:
+    """Request handling, batching and latency bookkeeping for the HTTP server."""
+
+    def __init__(self, workers=None, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.workers = workers
+        self.npv_batcher = MicroBatcher(self._process_npv, window, max_batch)
+        self.irr_batcher = MicroBatcher(self._process_irr, window, max_batch)
+        self.latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self.requests = defaultdict(int)
+        self._pool = None
+
+    def start(self):
+        # Spawned workers start from a fresh interpreter: forked ones would
+        # inherit the client sockets open when the pool grows, and a client
+        # reading a closed connection to EOF would hang until they exit
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.npv_batcher.start()
+        self.irr_batcher.start()
+
+    async def warm_up(self):
+        """Start a worker and load the solver in it, so the first /irr request does not pay for it."""
+        await asyncio.get_running_loop().run_in_executor(self._pool, _solve_irrs, [[-1.0, 1.1]], 0.0001, 0.9999)
+
+    async def stop(self):
+        await self.npv_batcher.stop()
+        await self.irr_batcher.stop()
+        if self._pool:
+            self._pool.shutdown(cancel_futures=True)
+
+    async def _process_npv(self, requests):
+        # NumPy releases the GIL in the matrix product, so a thread keeps the loop free
+        return await asyncio.to_thread(_evaluate_npvs, requests)
+
+    async def _process_irr(self, requests):
+        loop = asyncio.get_running_loop()
+        groups = defaultdict(list)
+        for index, (cash_flows, rate_min, rate_max) in enumerate(requests):
+            groups[rate_min, rate_max].append(index)
+        jobs = {
+            bounds: loop.run_in_executor(self._pool, _solve_irrs, [requests[i][0] for i in indices], *bounds)
+            for bounds, indices in groups.items()
+        }
+        results = [None] * len(requests)
+        for bounds, indices in groups.items():
+            for index, irrs in zip(indices, await jobs[bounds]):
+                results[index] = {"irrs": irrs, "sign_changes": count_sign_changes(requests[index][0])}
+        return results
+
+    async def handle(self, method, path, body):
+        """Return (status, payload) for one request."""
+        start = time.perf_counter()
+        try:
+            status, payload = await self._dispatch(method, path, body)
+        except RequestError as exc:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except Exception as exc:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"}
+        # Unknown paths share one bucket so arbitrary URLs cannot grow the statistics
+        route = path if path in ROUTES else "(other)"
+        self.requests[route, int(status)] += 1
+        self.latencies[route].append(time.perf_counter() - start)
+        return status, payload
+
+    async def _dispatch(self, method, path, body):
+        if path not in ROUTES:
+            return HTTPStatus.NOT_FOUND, {"error": f"unknown path {path}"}
+        if method != ROUTES[path]:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"use {ROUTES[path]} for {path}"}
+        if path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        if path == "/stats":
+            return HTTPStatus.OK, self.stats()
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise RequestError("body is not valid JSON") from None
+        if not isinstance(payload, dict):
+            raise RequestError("body must be a JSON object")
+        cash_flows = _cash_flows(payload)
+        if path == "/npv":
+            npvs = await self.npv_batcher.submit((cash_flows, _rates(payload)))
+            return HTTPStatus.OK, {"npv": npvs}
+        try:
+            rate_min = float(payload.get("rate_min", 0.0001))
+            rate_max = float(payload.get("rate_max", 0.9999))
+        except (TypeError, ValueError):
+            raise RequestError("'rate_min' and 'rate_max' must be numbers") from None
+        if not -1 < rate_min < rate_max:
+            raise RequestError("need -1 < rate_min < rate_max")
+        return HTTPStatus.OK, await self.irr_batcher.submit((cash_flows, rate_min, rate_max))
+
+    def stats(self):
+        latency = {}
+        for path, samples in self.latencies.items():
+            ms = np.array(samples) * 1e3
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            latency[path] = {"count": len(ms), "p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "max_ms": ms.max()}
+        return {
+            "latency": latency,
+            "requests": {f"{path} {status}": count for (path, status), count in sorted(self.requests.items())},
+            "batches": {
+                name: {"batches": b.batches, "items": b.items,
+                       "mean_batch_size": b.items / b.batches if b.batches else 0.0}
+                for name, b in (("npv", self.npv_batcher), ("irr", self.irr_batcher))
+            },
+        }
+
+
+async def _read_request(reader):
+    """Read one HTTP/1.1 request. Returns (method, path, headers, body) or None at EOF."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY:
+        raise RequestError("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def _response(status, payload, keep_alive):
+    try:
+        body = json.dumps(payload, allow_nan=False).encode()
+    except ValueError:
+        # NaN and Infinity are not JSON; never send a body clients cannot parse
+        status = HTTPStatus.INTERNAL_SERVER_ERROR
+        body = json.dumps({"error": "result is not a finite number"}).encode()
+    head = (f"HTTP/1.1 {int(status)} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def serve(host="127.0.0.1", port=8765, workers=None, ready=None):
+    """Run the service until cancelled. ``ready`` (an asyncio.Event) is set once listening."""
+    service = NPVService(workers)
+    service.start()
+
+    async def connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (RequestError, ValueError) as exc:
+                    writer.write(_response(HTTPStatus.BAD_REQUEST, {"error": str(exc)}, False))
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await service.handle(method, path, body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    try:
+        await service.warm_up()
+        server = await asyncio.start_server(connection, host, port)
+        async with server:
+            if ready is not None:
+                ready.set()
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve NPV/IRR computations over local HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for the IRR search (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    print(f"Serving NPV/IRR on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Columnar, memory-mapped store for batch NPV/IRR results.
+
+A result set is a directory of plain ``.npy`` arrays, so any NumPy tool can
+open it with ``np.load(..., mmap_mode="r")`` without reading it into memory:
+
+    meta.json          format, version, number of projects and IRRs, the rate grid
+    ids.npy            project ids (fixed-width unicode), one per project
+    npv.npy            float64 (projects, rates): the NPV at every grid rate
+    irr_offsets.npy    int64 (projects + 1): project i's IRRs are irrs[offsets[i]:offsets[i + 1]]
+    irrs.npy           float64: the IRRs of all projects, one after the other
+    sign_changes.npy   int32 (projects): sign changes in each project's cash flows
+
+``meta.json`` is removed first and written last, so an interrupted run never
+looks complete, even when it was overwriting an earlier store.
+"""
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+FORMAT = "npv_irr.store"
+VERSION = 1
+
+# Values copied per block when the IRRs are moved into their final array
+COPY_BLOCK = 1 << 20
+
+
+def write_store(path, ids, rates, results):
+    """Write ``results`` ((npvs, irrs, sign_changes) per project, as yielded by
+    :func:`npv_irr.batch.evaluate_portfolio`) to a result store at ``path``.
+
+    Rows go straight to memory-mapped files, so no result is kept in memory;
+    the IRRs, whose total count is only known at the end, are streamed to a
+    scratch file first. Returns the number of projects written.
+    """
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))
+    projects = len(ids)
+    os.makedirs(path, exist_ok=True)
+    try:
+        os.remove(os.path.join(path, "meta.json"))
+    except FileNotFoundError:
+        pass
+    np.save(os.path.join(path, "ids.npy"), np.asarray(ids, dtype=str))
+    npv = open_memmap(os.path.join(path, "npv.npy"), mode="w+", dtype=np.float64, shape=(projects, rates.size))
+    offsets = open_memmap(os.path.join(path, "irr_offsets.npy"), mode="w+", dtype=np.int64, shape=(projects + 1,))
+    sign_changes = open_memmap(os.path.join(path, "sign_changes.npy"), mode="w+", dtype=np.int32,
+                               shape=(projects,))
+
+    scratch = os.path.join(path, "irrs.tmp")
+    count = 0
+    offsets[0] = 0
+    try:
+        with open(scratch, "wb") as f:
+            for i, (row_npvs, row_irrs, row_sign_changes) in enumerate(results):
+                npv[i] = row_npvs
+                sign_changes[i] = row_sign_changes
+                f.write(np.asarray(row_irrs, dtype=np.float64).tobytes())
+                count += len(row_irrs)
+                offsets[i + 1] = count
+
+        irrs = open_memmap(os.path.join(path, "irrs.npy"), mode="w+", dtype=np.float64, shape=(count,))
+        if count:
+            source = np.memmap(scratch, dtype=np.float64, mode="r", shape=(count,))
+            for start in range(0, count, COPY_BLOCK):
+                irrs[start:start + COPY_BLOCK] = source[start:start + COPY_BLOCK]
+            del source
+        for array in (npv, offsets, sign_changes, irrs):
+            array.flush()
+        del npv, offsets, sign_changes, irrs
+    finally:
+        if os.path.exists(scratch):
+            os.remove(scratch)
+
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"format": FORMAT, "version": VERSION, "projects": projects, "irrs": count,
+                   "rates": rates.tolist()}, f)
+    return projects
+
+
+def _load(path, name):
+    array = np.load(os.path.join(path, name), mmap_mode="r")
+    # NumPy cannot map an empty array; an empty one costs nothing to load
+    return array if array.size else np.load(os.path.join(path, name))
+
+
+class ResultStore:
+    """Read-only view of a result store; arrays are memory-mapped, so opening is instant."""
+
+    def __init__(self, path):
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"{path} is not a complete result store (no meta.json)") from None
+        if meta.get("format") != FORMAT or meta.get("version") != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} {FORMAT} result store")
+        self.path = path
+        self.rates = np.asarray(meta["rates"], dtype=float)
+        self.ids = _load(path, "ids.npy")
+        self.npv = _load(path, "npv.npy")
+        self.irr_offsets = _load(path, "irr_offsets.npy")
+        self.irr_values = _load(path, "irrs.npy")
+        self.sign_changes = _load(path, "sign_changes.npy")
+        projects, count = meta["projects"], meta["irrs"]
+        expected = {"ids.npy": (self.ids, (projects,)), "npv.npy": (self.npv, (projects, self.rates.size)),
+                    "irr_offsets.npy": (self.irr_offsets, (projects + 1,)), "irrs.npy": (self.irr_values, (count,)),
+                    "sign_changes.npy": (self.sign_changes, (projects,))}
+        for name, (array, shape) in expected.items():
+            if array.shape != shape:
+                raise ValueError(f"{path} is not a complete result store ({name} has shape {array.shape}, "
+                                 f"meta.json expects {shape})")
+
+    def __len__(self):
+        return self.npv.shape[0]
+
+    @property
+    def irr_counts(self):
+        return np.diff(self.irr_offsets)
+
+    def irrs(self, index):
+        """The IRRs of project ``index``."""
+        return self.irr_values[self.irr_offsets[index]:self.irr_offsets[index + 1]]
+
+    def rows(self, start, stop):
+        """Return projects ``start``..``stop - 1`` as columns: id, NPV at each rate, IRR count, IRRs, sign changes.
+
+        Only this slice of the files is read, so paging through millions of
+        projects stays cheap.
+        """
+        stop = min(stop, len(self))
+        offsets = np.asarray(self.irr_offsets[start:stop + 1])
+        values = np.asarray(self.irr_values[offsets[0]:offsets[-1]]) if stop > start else np.empty(0)
+        columns = {"id": [str(x) for x in self.ids[start:stop]]}
+        for j, rate in enumerate(self.rates):
+            columns[f"npv@{rate:g}"] = np.asarray(self.npv[start:stop, j])
+        columns["irr_count"] = np.diff(offsets)
+        columns["irrs"] = [";".join(f"{irr:.6g}" for irr in values[lo - offsets[0]:hi - offsets[0]])
+                           for lo, hi in zip(offsets[:-1], offsets[1:])]
+        columns["sign_changes"] = np.asarray(self.sign_changes[start:stop])
+        return columns
@@ -0,0 +1,31 @@
+"""Paginated HTML rendering of the cash-flow summary table."""
+import numpy as np
+
+# Rows shown per page of the summary table
+PAGE_SIZE = 25
+
+_HEADER = "<table width='100%'><thead><tr><th>Period</th><th>Cash Flow</th></tr></thead><tbody>"
+_ROW = "<tr><td style='text-align: center;'>{}</td><td style='text-align: right; color: {};'>€{:,.2f}</td></tr>"
+
+# Negative values in red, positive in green, zero in black
+_NEGATIVE, _POSITIVE, _ZERO = "#DC2626", "#16A34A", "#000000"
+
+
+def page_count(n_rows, page_size=PAGE_SIZE):
+    """Number of pages needed for ``n_rows`` rows (at least one)."""
+    return max(1, -(-n_rows // page_size))
+
+
+def cash_flow_table_html(cash_flows, page=1, page_size=PAGE_SIZE):
+    """Return the HTML table for one page (1-based) of the cash flows.
+
+    Only the rows of the requested page are formatted, so the cost and the
+    size of the HTML sent to the browser do not grow with the series length.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    start = (min(max(page, 1), page_count(cash_flows.size, page_size)) - 1) * page_size
+    values = cash_flows[start:start + page_size]
+    periods = np.arange(start, start + values.size)
+    colors = np.where(values < 0, _NEGATIVE, np.where(values > 0, _POSITIVE, _ZERO))
+    rows = "".join(map(_ROW.format, periods.tolist(), colors.tolist(), values.tolist()))
+    return _HEADER + rows + "</tbody></table>"
@@ -0,0 +1,92 @@
+"""NPV under a term structure of rates, and XNPV/XIRR for dated cash flows.
+
+Simple NPV/IRR assume one flat rate and whole periods. Here the discount
+rate may change from period to period (forward rates, compounded with a
+cumulative product) or be quoted per cash-flow date (spot rates, applied
+as fractional powers). Both kernels take many curves at once, one per row,
+so scenario analysis over thousands of yield curves is a single matrix
+product.
+"""
+import numpy as np
+
+from .irr import _check_rate_range, _roots_from_scan
+from .npv import discount_factors
+
+DAYS_PER_YEAR = 365.0
+
+
+def year_fractions(dates):
+    """Years from the first date to each date (actual/365, as in spreadsheet XNPV)."""
+    days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+    return (days - days[0]) / DAYS_PER_YEAR
+
+
+def forward_discount_factors(forward_rates):
+    """Discount factors for periods 0..n from per-period rates.
+
+    ``forward_rates[..., t - 1]`` is the rate applying from period t - 1 to
+    t, so factor t is the product of 1 / (1 + r_k) for k <= t. Accepts one
+    curve (1D) or many (one per row) and returns n + 1 factors per curve.
+    """
+    growth = np.log1p(np.asarray(forward_rates, dtype=float))
+    cumulative = np.cumsum(growth, axis=-1)
+    zero = np.zeros(cumulative.shape[:-1] + (1,))
+    return np.exp(-np.concatenate((zero, cumulative), axis=-1))
+
+
+def spot_discount_factors(spot_rates, times):
+    """Discount factors (1 + s_i) ** -t_i for spot rates quoted at each time.
+
+    ``spot_rates`` has one entry per time, for one curve (1D) or many (rows).
+    """
+    return np.exp(-np.log1p(np.asarray(spot_rates, dtype=float)) * np.asarray(times, dtype=float))
+
+
+def npv_forward_curves(cash_flows, forward_rates):
+    """NPV of one series under each curve of per-period rates.
+
+    ``forward_rates`` holds len(cash_flows) - 1 rates per curve; with a 2D
+    array of curves the result has one NPV per curve.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    forward_rates = np.asarray(forward_rates, dtype=float)
+    if forward_rates.shape[-1] != cash_flows.size - 1:
+        raise ValueError(
+            f"need {cash_flows.size - 1} per-period rates for {cash_flows.size} cash flows, "
+            f"got {forward_rates.shape[-1]}"
+        )
+    return forward_discount_factors(forward_rates) @ cash_flows
+
+
+def xnpv(rate, cash_flows, dates):
+    """NPV of dated cash flows at an annual rate (or a 1D array of rates), discounted to the first date."""
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    npvs = discount_factors(rate, year_fractions(dates)) @ cash_flows
+    return float(npvs[0]) if np.ndim(rate) == 0 else npvs
+
+
+def xnpv_curves(cash_flows, dates, spot_rates):
+    """NPV of dated cash flows under each yield curve.
+
+    ``spot_rates`` gives the annual spot rate at every cash-flow date, one
+    curve per row; the result has one NPV per curve.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    return spot_discount_factors(spot_rates, year_fractions(dates)) @ cash_flows
+
+
+def xirr(cash_flows, dates, rate_min=-0.99, rate_max=0.9999, tol=1e-10, scan_points=512):
+    """Return every annual rate in [rate_min, rate_max] at which the XNPV is zero, sorted.
+
+    Same root isolation as :func:`npv_irr.irr.find_irrs` (vectorized scan of
+    the XNPV and its slope, then safeguarded Newton), with fractional times.
+    Raises ValueError unless -1 < rate_min < rate_max.
+    """
+    _check_rate_range(rate_min, rate_max)
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    times = year_fractions(dates)
+    rates = np.linspace(rate_min, rate_max, scan_points)
+    factors = discount_factors(rates, times)
+    npvs = factors @ cash_flows
+    slopes = -(factors @ (times * cash_flows)) / (1.0 + rates)
+    return _roots_from_scan(cash_flows, rates, npvs, slopes, tol, times)
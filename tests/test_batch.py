@@ -0,0 +1,166 @@
+import csv
+
+import numpy as np
+import pytest
+
+from npv_irr import irr_roots, irr_summary
+from npv_irr.batch import evaluate_portfolio, main, read_csv, read_parquet, run
+from npv_irr.npv import npv_matrix, pad_cash_flows
+from npv_irr.store import ResultStore
+
+# Two IRRs (10% and 20%), one IRR, and IRRs of -50% and 30%, one of them outside the search range
+PORTFOLIO = "two IRRs,-100,230,-132\nconventional,-100,60,60\noutside,-100,180,-65\n"
+
+
+def write(tmp_path, text, name="projects.csv"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_csv_ids(tmp_path):
+    path = write(tmp_path, "A,-100,110\n1001,-100,120\n\n,\nB,-50,60\n")
+    ids, series = read_csv(path)
+    # A numeric first cell is a cash flow unless id_column says otherwise; blank rows are skipped
+    assert ids == ["A", "1", "B"]
+    assert [s.tolist() for s in series] == [[-100, 110], [1001, -100, 120], [-50, 60]]
+
+    ids, series = read_csv(path, id_column=True)
+    assert ids == ["A", "1001", "B"]
+    assert [s.tolist() for s in series] == [[-100, 110], [-100, 120], [-50, 60]]
+
+    with pytest.raises(ValueError, match="row 1, column 1 is not a number: 'A'"):
+        read_csv(path, id_column=False)
+
+
+def test_csv_trailing_blank_cells_are_ignored(tmp_path):
+    _, series = read_csv(write(tmp_path, "A,-100,110,,\nB,-100,50,70, \n"))
+    assert [s.tolist() for s in series] == [[-100, 110], [-100, 50, 70]]
+
+
+def test_csv_interior_blank_cell_is_an_error(tmp_path):
+    # Skipping it would move the later cash flows to earlier periods
+    with pytest.raises(ValueError, match="row 2, column 3 is empty"):
+        read_csv(write(tmp_path, "A,-100,110\nB,-100,,70\n"))
+
+
+@pytest.mark.parametrize("token", ["nan", "inf", "-inf", "1e999"])
+def test_csv_rejects_non_finite_values(tmp_path, token):
+    with pytest.raises(ValueError, match=f"row 1, column 3 is not a finite number: '{token}'"):
+        read_csv(write(tmp_path, f"A,-100,{token},50\n"))
+
+
+def test_parquet_list_column(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "projects.parquet")
+    pq.write_table(pa.table({"id": ["A", "B"], "cash_flows": [[-100.0, 110.0], [-100.0, 50.0, 70.0]]}), path)
+
+    ids, series = read_parquet(path)
+
+    assert ids == ["A", "B"]
+    assert [s.tolist() for s in series] == [[-100, 110], [-100, 50, 70]]
+
+
+def test_parquet_wide_columns(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "projects.parquet")
+    pq.write_table(pa.table({"t0": [-100.0, -100.0], "t1": [110.0, 50.0], "t2": [None, 70.0]}), path)
+
+    ids, series = read_parquet(path)
+
+    # A trailing null ends the shorter project
+    assert ids == ["0", "1"]
+    assert [s.tolist() for s in series] == [[-100, 110], [-100, 50, 70]]
+
+
+def test_parquet_interior_null_is_an_error(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "projects.parquet")
+    pq.write_table(pa.table({"t0": [-100.0, -100.0], "t1": [110.0, None], "t2": [None, 70.0]}), path)
+    with pytest.raises(ValueError, match="row 2 has no value in column 't1'"):
+        read_parquet(path)
+
+
+@pytest.mark.parametrize("value", [np.inf, -np.inf])
+def test_parquet_rejects_non_finite_values(tmp_path, value):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "projects.parquet")
+    pq.write_table(pa.table({"cash_flows": [[-100.0, 60.0], [-100.0, value, 50.0]]}), path)
+    with pytest.raises(ValueError, match="row 2, period 1 is not a finite number"):
+        read_parquet(path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_portfolio_irrs_match_the_app(workers):
+    rng = np.random.default_rng(11)
+    series = [rng.normal(size=n) for n in rng.integers(2, 12, size=300)]
+    cash_flows, lengths = pad_cash_flows(series)
+
+    results = list(evaluate_portfolio(cash_flows, lengths, [0.1], chunk_rows=64, workers=workers))
+
+    assert len(results) == len(series)
+    for s, (_, irrs, sign_changes) in zip(series, results):
+        expected, expected_sign_changes, _ = irr_summary(s)
+        assert len(irrs) == len(expected)
+        np.testing.assert_allclose(irrs, expected, atol=1e-9)
+        assert sign_changes == expected_sign_changes
+
+
+def test_all_roots_ignores_the_search_range():
+    cash_flows, lengths = pad_cash_flows([[-100, 180, -65], [-100, 230, -132]])
+    results = evaluate_portfolio(cash_flows, lengths, [0.1], rate_min=0.25, rate_max=0.5, all_roots=True)
+    for row, (_, irrs, _) in zip(cash_flows, results):
+        np.testing.assert_allclose(irrs, irr_roots(row), atol=1e-12)
+
+
+def test_run_writes_csv(tmp_path):
+    output = str(tmp_path / "results.csv")
+
+    assert run(write(tmp_path, PORTFOLIO), output, [0.05, 0.1]) == 3
+
+    with open(output, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["id", "npv@0.05", "npv@0.1", "irr_count", "irrs", "sign_changes"]
+    _, series = read_csv(write(tmp_path, PORTFOLIO))
+    for row, s, name in zip(rows[1:], series, ["two IRRs", "conventional", "outside"]):
+        expected_irrs, sign_changes, _ = irr_summary(s)
+        assert row[0] == name
+        np.testing.assert_allclose([float(x) for x in row[1:3]], npv_matrix(s[None, :], [0.05, 0.1])[0], atol=1e-9)
+        assert int(row[3]) == len(expected_irrs)
+        np.testing.assert_allclose([float(x) for x in row[4].split(";")], expected_irrs, atol=1e-9)
+        assert int(row[5]) == sign_changes
+    # The IRR of -50% lies outside the search range, and is reported as in the app
+    assert int(rows[3][3]) == 2
+
+
+def test_run_writes_store(tmp_path):
+    output = str(tmp_path / "results")
+
+    assert run(write(tmp_path, PORTFOLIO), output, [0.05, 0.1], output_format="store") == 3
+
+    store = ResultStore(output)
+    _, series = read_csv(write(tmp_path, PORTFOLIO))
+    assert len(store) == 3
+    assert store.ids.tolist() == ["two IRRs", "conventional", "outside"]
+    np.testing.assert_allclose(store.rates, [0.05, 0.1])
+    np.testing.assert_allclose(store.npv, npv_matrix(pad_cash_flows(series)[0], [0.05, 0.1]))
+    for i, s in enumerate(series):
+        np.testing.assert_allclose(store.irrs(i), irr_summary(s)[0], atol=1e-9)
+    assert store.sign_changes.tolist() == [2, 1, 2]
+
+
+def test_cli_rejects_irr_min_below_minus_one(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main([write(tmp_path, PORTFOLIO), str(tmp_path / "out.csv"), "--irr-min", "-1.5"])
+    assert "--irr-min" in capsys.readouterr().err
+
+
+def test_cli_reports_bad_input(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main([write(tmp_path, "A,-100,,70\n"), str(tmp_path / "out.csv")])
+    assert exit_info.value.code == 1
+    assert "row 1, column 3 is empty" in capsys.readouterr().err
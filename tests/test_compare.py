@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from npv_irr.compare import compare_projects, crossover_rates
+from npv_irr.npv import compute_npv
+from npv_irr.parsing import ParseError, ParseIssue, parse_projects
+
+
+def test_crossover_rate():
+    # The difference -80 / (1 + r) + 100 / (1 + r) ** 2 is zero at 25%
+    (i, j, rate, npv), = crossover_rates([[-100, 0, 150], [-100, 80, 50]])
+    assert (i, j) == (0, 1)
+    assert rate == pytest.approx(0.25, abs=1e-10)
+    assert npv == pytest.approx(compute_npv([-100, 0, 150], 0.25), abs=1e-9)
+
+
+def test_projects_have_equal_npvs_at_every_crossover():
+    rng = np.random.default_rng(9)
+    series = [np.r_[-100, rng.uniform(-40, 120, n)] for n in rng.integers(1, 8, size=12)]
+
+    crossovers = crossover_rates(series)
+
+    assert crossovers
+    assert [rate for _, _, rate, _ in crossovers] == sorted(rate for _, _, rate, _ in crossovers)
+    for i, j, rate, npv in crossovers:
+        assert i < j
+        assert abs(compute_npv(series[i], rate) - compute_npv(series[j], rate)) < 1e-8
+        assert npv == pytest.approx(compute_npv(series[j], rate), abs=1e-8)
+
+
+@pytest.mark.parametrize("series", [
+    [[-100, 60, 60], [-100, 60, 60]],
+    [[-100, 60, 60], [-100, 60, 60, 0, 0]],
+    [[-100, 60, 60]],
+])
+def test_identical_projects_never_cross(series):
+    assert crossover_rates(series) == []
+
+
+def test_compare_projects():
+    rates, profiles, crossovers = compare_projects([[-100, 0, 150], [-100, 80, 50, 0]], 0.0, 0.5, points=11)
+    np.testing.assert_allclose(rates, np.linspace(0, 0.5, 11))
+    assert profiles.shape == (2, 11)
+    np.testing.assert_allclose(profiles[1], [compute_npv([-100, 80, 50], rate) for rate in rates])
+    assert [rate for _, _, rate, _ in crossovers] == pytest.approx([0.25])
+
+
+def test_projects():
+    names, series = parse_projects("A: -100, 110\n\n-50, 60\n")
+    assert names == ["A", "Project 2"]
+    np.testing.assert_array_equal(series[0], [-100, 110])
+    np.testing.assert_array_equal(series[1], [-50, 60])
+
+
+def test_blank_project_name_is_numbered():
+    names, _ = parse_projects(" : -100, 110\nB: -50, 60")
+    assert names == ["Project 1", "B"]
+
+
+def test_project_errors_are_located_in_the_whole_text():
+    with pytest.raises(ParseError) as error:
+        parse_projects("A: -100, 110\nB: -100,  x\nC:")
+    assert error.value.issues == [ParseIssue(1, 2, 11, "x", "not a number"), ParseIssue(0, 3, 3, "", "no cash flows")]
@@ -0,0 +1,124 @@
+import importlib.util
+import pathlib
+
+import numpy as np
+import pytest
+
+from npv_irr import find_irrs, find_irrs_batch, irr_roots, irr_roots_batch, irr_summary
+from npv_irr.irr import ALL_ROOTS_MAX_PERIODS
+
+_spec = importlib.util.spec_from_file_location(
+    "irr_solver", pathlib.Path(__file__).resolve().parents[1] / "benchmarks" / "irr_solver.py"
+)
+irr_solver = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(irr_solver)
+
+
+def with_irrs(*rates):
+    """Cash flows (starting with -100) whose IRRs are exactly ``rates``."""
+    coefficients = np.poly(1 / (1 + np.asarray(rates, dtype=float)))[::-1]
+    return (coefficients * -100 / coefficients[0]).tolist()
+
+
+CASES = {
+    "template": ([-1000, 300, 400, 500, 600], None),
+    "two IRRs": ([-100, 230, -132], [0.1, 0.2]),
+    "one IRR": (with_irrs(0.1), [0.1]),
+    "three IRRs": (with_irrs(0.05, 0.3, 0.6), [0.05, 0.3, 0.6]),
+    "IRRs outside the range": (with_irrs(-0.5, 0.12, 2.0), [0.12]),
+    "no IRR": ([100, 50, 25], []),
+}
+
+
+@pytest.mark.parametrize("cash_flows, expected", CASES.values(), ids=CASES.keys())
+def test_find_irrs_matches_legacy_scan(cash_flows, expected):
+    irrs = find_irrs(cash_flows)
+    legacy, _ = irr_solver.legacy_find_multiple_irrs(cash_flows)
+    assert len(irrs) == len(legacy)
+    np.testing.assert_allclose(irrs, legacy, atol=1e-3)
+    if expected is not None:
+        np.testing.assert_allclose(irrs, expected, atol=1e-9)
+
+
+def test_find_irrs_separates_close_roots():
+    # Closer together than the scan spacing, and merged by the legacy scan
+    np.testing.assert_allclose(find_irrs(with_irrs(0.1, 0.1005)), [0.1, 0.1005], atol=1e-9)
+
+
+def test_find_irrs_agrees_with_irr_roots():
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        cash_flows = rng.normal(size=rng.integers(2, 12))
+        cash_flows[0] = -abs(cash_flows[0])
+        expected = [rate for rate in irr_roots(cash_flows) if 0.0001 <= rate <= 0.9999]
+        np.testing.assert_allclose(find_irrs(cash_flows), expected, atol=1e-8)
+
+
+def test_find_irrs_batch_matches_find_irrs():
+    rng = np.random.default_rng(3)
+    series = [rng.normal(size=n) for n in rng.integers(2, 20, size=300)]
+    lengths = np.array([s.size for s in series])
+    matrix = np.zeros((len(series), lengths.max()))
+    for row, s in zip(matrix, series):
+        row[:s.size] = s
+
+    for s, irrs in zip(series, find_irrs_batch(matrix, lengths)):
+        np.testing.assert_allclose(irrs, find_irrs(s), atol=1e-10)
+
+
+@pytest.mark.parametrize("rate_min, rate_max", [(-1.5, 0.5), (-1.0, 0.5), (0.5, 0.5), (0.6, 0.5), (np.nan, 0.5)])
+def test_search_range_is_validated(rate_min, rate_max):
+    with pytest.raises(ValueError, match="rate_min < rate_max"):
+        find_irrs([-100, 230, -132], rate_min, rate_max)
+    with pytest.raises(ValueError, match="rate_min < rate_max"):
+        find_irrs_batch([[-100, 230, -132]], None, rate_min, rate_max)
+
+
+def test_negative_search_range():
+    np.testing.assert_allclose(find_irrs(with_irrs(-0.5, 0.3), rate_min=-0.9), [-0.5, 0.3], atol=1e-9)
+
+
+def test_irr_roots_finds_every_real_irr():
+    np.testing.assert_allclose(irr_roots(with_irrs(-0.5, 0.1, 1.5)), [-0.5, 0.1, 1.5], atol=1e-9)
+    np.testing.assert_allclose(irr_roots([-100, 230, -132]), [0.1, 0.2], atol=1e-12)
+
+
+def test_double_root_is_reported_once():
+    np.testing.assert_allclose(irr_roots(with_irrs(0.2, 0.2)), [0.2], atol=1e-7)
+    np.testing.assert_allclose(irr_roots(with_irrs(-0.5, 0.3, 0.3)), [-0.5, 0.3], atol=1e-7)
+    assert [len(roots) for roots in irr_roots_batch([with_irrs(0.2, 0.2), with_irrs(0.1, 0.2)])] == [1, 2]
+
+
+@pytest.mark.parametrize("cash_flows", [[0, 0, 0], [100], [0, -100, 0], [100, 50, 25]])
+def test_irr_roots_without_irrs(cash_flows):
+    assert irr_roots(cash_flows) == []
+
+
+def test_irr_roots_ignores_zero_padding():
+    # Leading and trailing zeros shift and truncate the polynomial, but leave the IRRs alone
+    np.testing.assert_allclose(irr_roots([0, -100, 230, -132, 0, 0]), [0.1, 0.2], atol=1e-12)
+
+
+def test_irr_roots_batch_matches_irr_roots():
+    rng = np.random.default_rng(5)
+    matrix = rng.normal(size=(50, 10))
+    lengths = rng.integers(1, 11, size=50)
+    for row, length, roots in zip(matrix, lengths, irr_roots_batch(matrix, lengths)):
+        np.testing.assert_allclose(roots, irr_roots(row[:length]), atol=1e-10)
+
+
+def test_irr_summary_adds_irrs_outside_the_range_of_short_series():
+    irrs, sign_changes, multiple = irr_summary(with_irrs(-0.5, 0.3, 1.5))
+    np.testing.assert_allclose(irrs, [-0.5, 0.3, 1.5], atol=1e-9)
+    assert multiple
+
+
+def test_irr_summary_skips_the_all_roots_solver_for_long_series():
+    cash_flows = with_irrs(-0.5, 0.3) + [0.0] * ALL_ROOTS_MAX_PERIODS
+    np.testing.assert_allclose(irr_summary(cash_flows)[0], [0.3], atol=1e-9)
+
+
+@pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf])
+def test_non_finite_cash_flows_have_no_irrs(bad):
+    assert irr_roots([-100, bad, 110]) == []
+    assert irr_summary([-100, bad, 110])[0] == []
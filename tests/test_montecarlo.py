@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from npv_irr.montecarlo import SimulationAccumulator, StreamingHistogram, simulate
+
+
+def test_results_do_not_depend_on_the_number_of_workers():
+    kwargs = dict(volatility=0.2, scenarios=5_000, seed=42, chunk_size=1_000)
+    serial = simulate([-1000, 300, 400, 500, 600], workers=1, **kwargs)
+    pooled = simulate([-1000, 300, 400, 500, 600], workers=2, **kwargs)
+    assert serial == pooled
+    assert serial["scenarios"] == 5_000
+    assert simulate([-1000, 300, 400, 500, 600], workers=1, **{**kwargs, "seed": 43}) != serial
+
+
+def test_merged_moments_match_numpy():
+    rng = np.random.default_rng(1)
+    chunks = [rng.normal(loc, scale, size) for loc, scale, size in [(5, 1, 10), (-200, 30, 1000), (1e4, 5, 3)]]
+    accumulator = SimulationAccumulator()
+    for chunk in chunks:
+        accumulator.add(chunk, np.array([]), np.zeros(chunk.size, dtype=np.int64))
+
+    summary = accumulator.summary()
+
+    values = np.concatenate(chunks)
+    assert summary["scenarios"] == values.size
+    assert summary["npv_mean"] == pytest.approx(np.mean(values), rel=1e-12)
+    assert summary["npv_std"] ** 2 == pytest.approx(np.var(values), rel=1e-10)
+    assert (summary["npv_min"], summary["npv_max"]) == (values.min(), values.max())
+    assert summary["prob_npv_negative"] == np.mean(values < 0)
+
+
+def test_histogram_quantiles_stay_within_one_bin_after_growing():
+    rng = np.random.default_rng(2)
+    # Each chunk reaches beyond the current range, on one side or the other. With 3999 values no
+    # quantile falls exactly between two bins, where any value across an empty gap would be right
+    chunks = [rng.uniform(0, 1, 1000), rng.normal(50, 10, 1000), rng.normal(-300, 20, 1000), rng.exponential(1e3, 999)]
+    histogram = StreamingHistogram(bins=256)
+    for chunk in chunks:
+        histogram.add(chunk)
+    values = np.concatenate(chunks)
+    assert histogram.low <= values.min() and values.max() < histogram.high
+    assert histogram.counts.sum() == values.size
+
+    qs = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+    np.testing.assert_allclose(histogram.quantiles(qs), np.quantile(values, qs, method="inverted_cdf"), rtol=0, atol=histogram.width)
@@ -0,0 +1,44 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from npv_irr import find_irrs_batch, find_irrs_parallel, iter_irrs_parallel, pad_cash_flows
+from npv_irr import parallel
+
+
+@pytest.fixture(scope="module")
+def portfolio():
+    rng = np.random.default_rng(4)
+    return pad_cash_flows([rng.normal(size=n) for n in rng.integers(2, 15, size=400)])
+
+
+def test_two_workers_match_find_irrs_batch(portfolio):
+    cash_flows, lengths = portfolio
+    expected = find_irrs_batch(cash_flows, lengths)
+
+    assert find_irrs_parallel(cash_flows, lengths, workers=2, chunk_rows=50) == expected
+    blocks = list(iter_irrs_parallel(cash_flows, lengths, workers=2, chunk_rows=50))
+    assert [len(block) for block in blocks] == [50] * 8
+    assert [irrs for block in blocks for irrs in block] == expected
+
+
+def test_shared_memory_is_released_when_closed_early(portfolio, monkeypatch):
+    cash_flows, lengths = portfolio
+    names = []
+    share = parallel._share
+
+    def recording_share(array):
+        block, spec = share(array)
+        names.append(block.name)
+        return block, spec
+
+    monkeypatch.setattr(parallel, "_share", recording_share)
+    blocks = iter_irrs_parallel(cash_flows, lengths, workers=2, chunk_rows=50)
+    assert next(blocks) == find_irrs_batch(cash_flows[:50], lengths[:50])
+    blocks.close()
+
+    assert len(names) == 2
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
@@ -0,0 +1,67 @@
+import io
+
+import numpy as np
+import pytest
+
+from npv_irr.parsing import ParseError, ParseIssue, parse_cash_flows
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("-100, 230, -132", [-100, 230, -132]),
+    ("-100\n230\n-132\n", [-100, 230, -132]),
+    ("-100, 230\n\n-132", [-100, 230, -132]),
+    ("  -1e3 , 2.5e2 ", [-1000, 250]),
+    # A comma ending a line and the line break are one separator
+    ("-1000, 300,\n400", [-1000, 300, 400]),
+    ("-1000,\r\n300, \n400,\n", [-1000, 300, 400]),
+    ("-1000\n, 300\n,400", [-1000, 300, 400]),
+])
+def test_valid_input(text, expected):
+    np.testing.assert_array_equal(parse_cash_flows(text), expected)
+    np.testing.assert_array_equal(parse_cash_flows(io.BytesIO(text.encode())), expected)
+
+
+@pytest.mark.parametrize("text, issues", [
+    ("1, x, 3", [ParseIssue(1, 1, 4, "x", "not a number")]),
+    ("-100\n200\n\nabc\n300", [ParseIssue(2, 4, 1, "abc", "not a number")]),
+    ("1,,2", [ParseIssue(1, 1, 3, "", "empty value")]),
+    ("1,2,", [ParseIssue(2, 1, 5, "", "empty value")]),
+    ("1, ,2", [ParseIssue(1, 1, 4, "", "empty value")]),
+    ("1,\n,2", [ParseIssue(1, 2, 1, "", "empty value")]),
+    ("1, nan, inf, 1e400", [ParseIssue(1, 1, 4, "nan", "not a finite number"),
+                            ParseIssue(2, 1, 9, "inf", "not a finite number"),
+                            ParseIssue(3, 1, 14, "1e400", "not a finite number")]),
+])
+def test_error_positions(text, issues):
+    with pytest.raises(ParseError) as error:
+        parse_cash_flows(text)
+    assert error.value.issues == issues
+    assert error.value.total == len(issues)
+    with pytest.raises(ParseError) as from_file:
+        parse_cash_flows(io.BytesIO(text.encode()))
+    assert from_file.value.issues == issues
+
+
+def test_file_positions_match_text():
+    text = "-100\n" + "10\n" * 50_000 + "oops\n5"
+    with pytest.raises(ParseError) as from_text:
+        parse_cash_flows(text)
+    with pytest.raises(ParseError) as from_file:
+        parse_cash_flows(io.BytesIO(text.encode()))
+    assert from_text.value.issues == from_file.value.issues == [ParseIssue(50_001, 50_002, 1, "oops", "not a number")]
+
+
+def test_reported_errors_are_capped():
+    with pytest.raises(ParseError) as error:
+        parse_cash_flows("a,b,c,d,e", max_errors=2)
+    assert [issue.token for issue in error.value.issues] == ["a", "b"]
+    assert error.value.total == 5
+    assert "(and 3 more)" in str(error.value)
+
+
+@pytest.mark.parametrize("text", ["", "\n\n"])
+def test_no_cash_flows(text):
+    with pytest.raises(ParseError, match="No cash flows entered") as error:
+        parse_cash_flows(text)
+    assert error.value.total == 0
+
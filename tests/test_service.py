@@ -0,0 +1,168 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from npv_irr.npv import npv_matrix
+from npv_irr.service import serve
+
+TIMEOUT = 30
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _message(method, path, body):
+    body = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+    return head.encode("latin-1") + body
+
+
+def _parse(response):
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), json.loads(body)
+
+
+@pytest.fixture(scope="module")
+def port():
+    port = _free_port()
+    loop = asyncio.new_event_loop()
+    listening = asyncio.Event()
+    task = loop.create_task(serve("127.0.0.1", port, workers=1, ready=listening))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + TIMEOUT
+    while not listening.is_set():
+        assert thread.is_alive() and time.monotonic() < deadline, "service did not start"
+        time.sleep(0.01)
+    yield port
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(TIMEOUT)
+
+
+def request(port, method, path, body=None):
+    """One request on its own connection, read to EOF; a socket timeout means the server never closed it."""
+    with socket.create_connection(("127.0.0.1", port), timeout=TIMEOUT) as sock:
+        sock.sendall(_message(method, path, body))
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    return _parse(b"".join(chunks))
+
+
+async def _concurrent(port, path, bodies):
+    async def one(body):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(_message("POST", path, body))
+        response = await reader.read()
+        writer.close()
+        return _parse(response)
+
+    return await asyncio.wait_for(asyncio.gather(*(one(body) for body in bodies)), TIMEOUT)
+
+
+def test_concurrent_npv_requests_are_batched(port):
+    before = request(port, "GET", "/stats")[1]["batches"]["npv"]
+    rng = np.random.default_rng(0)
+    bodies = [{"cash_flows": rng.normal(size=2 + i % 5).tolist(), "rates": [0.05, 0.01 * i]} for i in range(32)]
+
+    responses = asyncio.run(_concurrent(port, "/npv", bodies))
+
+    for body, (status, payload) in zip(bodies, responses):
+        assert status == 200
+        expected = npv_matrix(np.array([body["cash_flows"]]), np.array(body["rates"]))[0]
+        np.testing.assert_allclose(payload["npv"], expected, rtol=1e-12, atol=1e-12)
+    after = request(port, "GET", "/stats")[1]["batches"]["npv"]
+    assert after["items"] - before["items"] == 32
+    assert after["batches"] - before["batches"] < 32
+
+
+def test_each_npv_response_is_for_its_own_rates(port):
+    bodies = [{"cash_flows": [-100, 60, 60], "rates": [0.1]},
+              {"cash_flows": [-100, 60, 60], "rates": [0.1, 0.2]},
+              {"cash_flows": [-100, 30, 40, 50, 60], "rates": [0.2, 0.05, 0.3]},
+              {"cash_flows": [-50, 60], "rates": [0.1]}]
+
+    responses = asyncio.run(_concurrent(port, "/npv", bodies))
+
+    for body, (status, payload) in zip(bodies, responses):
+        assert status == 200
+        assert len(payload["npv"]) == len(body["rates"])
+        expected = [sum(c / (1 + rate) ** t for t, c in enumerate(body["cash_flows"])) for rate in body["rates"]]
+        np.testing.assert_allclose(payload["npv"], expected, rtol=1e-12)
+
+
+def test_concurrent_irr_requests(port):
+    bodies = [{"cash_flows": [-100, 230, -132]}, {"cash_flows": [-100, 110]},
+              {"cash_flows": [-100, 60, 60], "rate_min": 0.05, "rate_max": 0.5}]
+
+    responses = asyncio.run(_concurrent(port, "/irr", bodies))
+
+    assert [status for status, _ in responses] == [200, 200, 200]
+    np.testing.assert_allclose(responses[0][1]["irrs"], [0.1, 0.2], atol=1e-9)
+    np.testing.assert_allclose(responses[1][1]["irrs"], [0.1], atol=1e-9)
+    np.testing.assert_allclose(responses[2][1]["irrs"], [0.130662], atol=1e-6)
+    assert [payload["sign_changes"] for _, payload in responses] == [2, 1, 1]
+
+
+def test_connection_closes_after_irr_work(port):
+    # The pool's workers must not hold client sockets open, or this read to EOF hangs
+    assert request(port, "POST", "/irr", {"cash_flows": [-1, 1.5]})[0] == 200
+    assert request(port, "GET", "/health") == (200, {"status": "ok"})
+
+
+def test_overflowing_npv_is_null(port):
+    status, payload = request(port, "POST", "/npv", {"cash_flows": [1e308, 5e307], "rates": [0.1, -0.5]})
+    assert status == 200
+    assert payload["npv"][0] == pytest.approx(1e308 + 5e307 / 1.1)
+    assert payload["npv"][1] is None
+
+
+@pytest.mark.parametrize("path, body, error", [
+    ("/npv", b"{not json", "not valid JSON"),
+    ("/npv", [1, 2], "JSON object"),
+    ("/npv", {"rates": [0.1]}, "missing 'cash_flows'"),
+    ("/npv", {"cash_flows": []}, "non-empty"),
+    ("/npv", {"cash_flows": [1, 2], "rates": [-1.5]}, "above -1"),
+    ("/irr", {"cash_flows": [-1, 2], "rate_min": 0.5, "rate_max": 0.1}, "rate_min < rate_max"),
+])
+def test_bad_requests_are_400(port, path, body, error):
+    status, payload = request(port, "POST", path, body)
+    assert status == 400
+    assert error in payload["error"]
+
+
+def test_unknown_path_and_wrong_method(port):
+    assert request(port, "GET", "/nowhere")[0] == 404
+    assert request(port, "GET", "/npv")[0] == 405
+
+
+def test_stats(port):
+    request(port, "POST", "/npv", {"cash_flows": [-1, 1.1]})
+    request(port, "GET", "/missing")
+
+    status, stats = request(port, "GET", "/stats")
+
+    assert status == 200
+    assert stats["requests"]["/npv 200"] >= 1
+    assert stats["requests"]["(other) 404"] >= 1
+    latency = stats["latency"]["/npv"]
+    assert latency["count"] >= 1
+    assert 0 <= latency["p50_ms"] <= latency["p99_ms"] <= latency["max_ms"]
+    assert set(stats["batches"]) == {"npv", "irr"}
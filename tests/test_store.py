@@ -0,0 +1,63 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from npv_irr.store import ResultStore, write_store
+
+RATES = [0.05, 0.1]
+
+
+def results(count, fail_at=None):
+    """Rows like evaluate_portfolio yields: project i has i % 3 IRRs."""
+    for i in range(count):
+        if i == fail_at:
+            raise RuntimeError("interrupted")
+        yield [i, -i], [0.01 * i + 0.001 * k for k in range(i % 3)], i % 4
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "store")
+    ids = [f"P{i}" for i in range(10)]
+
+    assert write_store(path, ids, RATES, results(10)) == 10
+
+    store = ResultStore(path)
+    assert len(store) == 10
+    assert store.ids.tolist() == ids
+    np.testing.assert_array_equal(store.rates, RATES)
+    np.testing.assert_array_equal(store.npv, [[i, -i] for i in range(10)])
+    assert store.irr_counts.tolist() == [i % 3 for i in range(10)]
+    np.testing.assert_array_equal(store.irrs(5), [0.01 * 5, 0.01 * 5 + 0.001])
+    assert store.sign_changes.tolist() == [i % 4 for i in range(10)]
+    rows = store.rows(4, 6)
+    assert rows["id"] == ["P4", "P5"]
+    assert rows["irrs"] == ["0.04", "0.05;0.051"]
+    assert sorted(os.listdir(path)) == ["ids.npy", "irr_offsets.npy", "irrs.npy", "meta.json", "npv.npy",
+                                        "sign_changes.npy"]
+
+
+def test_interrupted_overwrite_is_not_complete(tmp_path):
+    path = str(tmp_path / "store")
+    write_store(path, [f"P{i}" for i in range(10)], RATES, results(10))
+
+    with pytest.raises(RuntimeError, match="interrupted"):
+        write_store(path, [f"P{i}" for i in range(1000)], RATES, results(1000, fail_at=500))
+
+    # The arrays are half rewritten: the old meta.json must not describe them
+    with pytest.raises(ValueError, match="not a complete result store"):
+        ResultStore(path)
+    assert not os.path.exists(os.path.join(path, "irrs.tmp"))
+
+
+def test_arrays_must_match_meta(tmp_path):
+    path = str(tmp_path / "store")
+    write_store(path, [f"P{i}" for i in range(10)], RATES, results(10))
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({**meta, "irrs": meta["irrs"] + 1}, f)
+
+    with pytest.raises(ValueError, match="irrs.npy has shape"):
+        ResultStore(path)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from npv_irr import compute_npv, npv_forward_curves, xirr, xnpv, xnpv_curves
+
+# The XNPV/XIRR example from the spreadsheet documentation
+CASH_FLOWS = [-10000, 2750, 4250, 3250, 2750]
+DATES = ["2008-01-01", "2008-03-01", "2008-10-30", "2009-02-15", "2009-04-01"]
+
+
+def test_xnpv_matches_the_spreadsheet():
+    assert xnpv(0.09, CASH_FLOWS, DATES) == pytest.approx(2086.6476, abs=1e-4)
+
+
+def test_xirr_matches_the_spreadsheet():
+    irrs = xirr(CASH_FLOWS, DATES)
+    np.testing.assert_allclose(irrs, [0.37336253], atol=1e-8)
+    assert xnpv(irrs[0], CASH_FLOWS, DATES) == pytest.approx(0, abs=1e-6)
+
+
+def test_flat_spot_curve_matches_xnpv():
+    curves = np.full((2, len(DATES)), 0.09)
+    np.testing.assert_allclose(xnpv_curves(CASH_FLOWS, DATES, curves), [xnpv(0.09, CASH_FLOWS, DATES)] * 2)
+
+
+def test_flat_forward_curve_matches_compute_npv():
+    cash_flows = [-1000, 300, 400, 500, 600]
+    curves = np.array([[0.1] * 4, [0.25] * 4])
+    np.testing.assert_allclose(npv_forward_curves(cash_flows, curves),
+                               [compute_npv(cash_flows, 0.1), compute_npv(cash_flows, 0.25)], rtol=1e-12)
+
+
+def test_forward_curve_length_is_checked():
+    with pytest.raises(ValueError, match="need 4 per-period rates for 5 cash flows, got 3"):
+        npv_forward_curves([-1000, 300, 400, 500, 600], [0.1, 0.1, 0.1])
+
+
+@pytest.mark.parametrize("rate_min, rate_max", [(-1.0, 0.5), (-2.0, 0.5), (0.5, 0.5), (0.6, 0.5)])
+def test_xirr_search_range_is_validated(rate_min, rate_max):
+    with pytest.raises(ValueError, match="rate_min < rate_max"):
+        xirr(CASH_FLOWS, DATES, rate_min, rate_max)